@@ -0,0 +1,103 @@
+"""Latency-SLO admission control: shed or degrade requests the workers cannot serve in time.
+
+Each admitted request counts as in-flight until it completes. With ``workers``
+requests served in parallel, a new request expects to wait for
+``ceil((in_flight + 1) / workers)`` service times, where the service time is an
+exponentially weighted moving average of recent measurements. If that estimate
+would exceed the SLO the request is either served in degraded form (when
+enabled and the cheaper estimate fits) or rejected up front.
+
+A request that finds a free worker is always served in full: it would not
+queue, so shedding or degrading it cannot help, and its measurement keeps the
+full service-time average current. One slow outlier therefore cannot leave
+the controller shedding once the load is gone.
+"""
+import math
+import threading
+from contextlib import contextmanager
+
+
+class Overloaded(Exception):
+    """Request rejected by admission control; retry after ``retry_after`` seconds."""
+
+    def __init__(self, retry_after: int):
+        super().__init__(f"Server overloaded, retry after {retry_after}s")
+        self.retry_after = retry_after
+
+
+class AdmissionController:
+    """Admit, degrade or shed requests against a latency SLO.
+
+    ``degraded_cost`` is the initial guess of a degraded request's service time
+    relative to a full one, until degraded requests have been measured. Until
+    the first measurement every request is admitted, as is every request that
+    finds fewer than ``workers`` requests in flight.
+    """
+
+    def __init__(self, slo_ms, workers, degrade=False, degraded_cost=0.2, alpha=0.1):
+        self.slo = slo_ms / 1000.0
+        self.workers = max(1, workers)
+        self.degrade = degrade
+        self.degraded_cost = degraded_cost
+        self.alpha = alpha
+        self._lock = threading.Lock()
+        self.in_flight = 0
+        self.service = {False: None, True: None}  # EWMA seconds, by degraded
+        self.served = 0
+        self.degraded = 0
+        self.shed = 0
+
+    def _service_time(self, degraded) -> float:
+        if self.service[degraded] is not None:
+            return self.service[degraded]
+        full = self.service[False] or 0.0
+        return full * self.degraded_cost if degraded else full
+
+    def _estimate(self, degraded) -> float:
+        """Expected latency of a new request given the current in-flight count."""
+        return math.ceil((self.in_flight + 1) / self.workers) * self._service_time(degraded)
+
+    @contextmanager
+    def admit(self):
+        """Hold an in-flight slot; yields True when the request should be degraded.
+
+        Raises Overloaded (before entering) when the request cannot meet the SLO.
+        """
+        with self._lock:
+            if self.in_flight < self.workers or self._estimate(False) <= self.slo:
+                degraded = False
+                self.served += 1
+            elif self.degrade and self._estimate(True) <= self.slo:
+                degraded = True
+                self.degraded += 1
+            else:
+                self.shed += 1
+                drain = self.in_flight / self.workers * self._service_time(False)
+                raise Overloaded(max(1, math.ceil(drain)))
+            self.in_flight += 1
+        try:
+            yield degraded
+        finally:
+            with self._lock:
+                self.in_flight -= 1
+
+    def record(self, seconds, degraded=False):
+        """Feed one measured service time (excluding queueing) into the moving average."""
+        with self._lock:
+            prev = self.service[degraded]
+            self.service[degraded] = seconds if prev is None else prev + self.alpha * (seconds - prev)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "slo_ms": self.slo * 1000.0,
+                "workers": self.workers,
+                "degrade": self.degrade,
+                "in_flight": self.in_flight,
+                "service_ms": {"full": (self.service[False] or 0.0) * 1000.0,
+                               "degraded": (self.service[True] or 0.0) * 1000.0},
+                "estimated_latency_ms": self._estimate(False) * 1000.0,
+                "served": self.served,
+                "degraded": self.degraded,
+                "shed": self.shed,
+            }
@@ -0,0 +1,76 @@
+"""Compare cold start of the default serving path vs LIGHTWEIGHT_SERVING=1.
+
+For each mode a fresh interpreter imports main (loading the models) and scores
+one request, reporting time-to-first-prediction, RSS once serving, and whether
+pandas / scikit-learn ended up in sys.modules. A separate ``-X importtime`` run
+gives the cumulative import time of the heaviest top-level packages.
+
+Run from backend/:  python bench_coldstart.py
+"""
+import json
+import os
+import re
+import subprocess
+import sys
+import time
+
+CURRENT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+MODES = {
+    "default": {"LIGHTWEIGHT_SERVING": "0"},
+    "lightweight": {"LIGHTWEIGHT_SERVING": "1"},
+}
+
+PROBE = """
+import json, sys, time
+import main
+from model_bundle import rss_mb
+main.predict(main.PredictionRequest())
+print(json.dumps({"ready": time.time(), "rss": rss_mb(),
+                  "pandas": "pandas" in sys.modules and sys.modules["pandas"] is not None,
+                  "sklearn": "sklearn" in sys.modules and sys.modules["sklearn"] is not None}))
+"""
+
+# Top-level packages whose cumulative import time is reported
+PACKAGES = ("main", "fastapi", "lightgbm", "pandas", "sklearn", "numba", "joblib")
+
+REPEATS = 5
+
+
+def run(env):
+    started = time.time()
+    out = subprocess.run([sys.executable, "-c", PROBE], capture_output=True, text=True, check=True,
+                         cwd=CURRENT_DIR, env={**os.environ, **env})
+    result = json.loads(out.stdout.strip().splitlines()[-1])
+    result["first_prediction"] = result.pop("ready") - started
+    return result
+
+
+def import_times(env) -> dict:
+    """Cumulative ``-X importtime`` microseconds per top-level package."""
+    out = subprocess.run([sys.executable, "-X", "importtime", "-c", "import main"], capture_output=True,
+                         text=True, check=True, cwd=CURRENT_DIR, env={**os.environ, **env})
+    times = {}
+    for line in out.stderr.splitlines():
+        m = re.match(r"import time:\s+\d+ \|\s+(\d+) \|( *)(\S+)$", line)
+        if m and m.group(3) in PACKAGES:
+            times[m.group(3)] = max(times.get(m.group(3), 0), int(m.group(1)))
+    return times
+
+
+if __name__ == "__main__":
+    print(f"{'Mode':<12} {'first pred ms':>14} {'RSS MB':>8} {'pandas':>7} {'sklearn':>8}")
+    print("-" * 53)
+    for name, env in MODES.items():
+        runs = [run(env) for _ in range(REPEATS)]
+        best = min(runs, key=lambda r: r["first_prediction"])
+        print(f"{name:<12} {best['first_prediction'] * 1e3:>14.1f} {best['rss']:>8.1f} "
+              f"{str(best['pandas']):>7} {str(best['sklearn']):>8}")
+
+    print()
+    print(f"{'Import (cumulative ms)':<24}" + "".join(f"{m:>14}" for m in MODES))
+    print("-" * (24 + 14 * len(MODES)))
+    per_mode = {name: import_times(env) for name, env in MODES.items()}
+    for pkg in PACKAGES:
+        print(f"{pkg:<24}" + "".join(
+            f"{per_mode[m][pkg] / 1e3:>14.1f}" if per_mode[m].get(pkg) else f"{'-':>14}" for m in MODES))
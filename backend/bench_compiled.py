@@ -0,0 +1,53 @@
+"""Benchmark the compiled shared-library predictor against Booster.predict on the fold models.
+
+Times (folds, N) log predictions for plan-built request rows at batch sizes 1,
+64 and 10k: the five fold Boosters (the current path) vs the compiled library
+fed float32 and float64 buffers (conversion included).
+
+Run from backend/:  python bench_compiled.py   (build the library first with: python compile_trees.py)
+"""
+import os
+import time
+
+import numpy as np
+
+from bench_engine import sample_requests
+from compile_trees import CompiledEnsemble
+from main import COMPILED_MODEL_PATH
+from parity_corpus import booster_predict
+
+BATCH_SIZES = [1, 64, 10000]
+REPEATS = 200
+
+
+def best_time(fn, X, repeats):
+    best = float("inf")
+    for _ in range(3):
+        start = time.perf_counter()
+        for _ in range(repeats):
+            fn(X)
+        best = min(best, (time.perf_counter() - start) / repeats)
+    return best
+
+
+if __name__ == "__main__":
+    if not os.path.exists(COMPILED_MODEL_PATH):
+        raise SystemExit(f"{COMPILED_MODEL_PATH} not found; run: python compile_trees.py")
+    rng = np.random.default_rng(42)
+    engines = {dtype: CompiledEnsemble(COMPILED_MODEL_PATH, dtype) for dtype in ("float32", "float64")}
+
+    X = sample_requests(rng, 5000)
+    for dtype, engine in engines.items():
+        assert np.array_equal(engine.predict_log(X), booster_predict(X.astype(dtype))), dtype
+    print(f"Parity: bit-identical to Booster.predict on {len(X)} plan-built rows (float32 and float64)")
+
+    print(f"\n{'Batch':>7} {'Booster ms':>12} {'f32 ms':>10} {'f64 ms':>10} {'f32 speedup':>12}")
+    print("-" * 55)
+    for n in BATCH_SIZES:
+        X = sample_requests(rng, n)
+        repeats = max(3, REPEATS // max(1, n // 64))
+        t_booster = best_time(booster_predict, X, repeats)
+        t_f32 = best_time(engines["float32"].predict_log, X, repeats)
+        t_f64 = best_time(engines["float64"].predict_log, X, repeats)
+        print(f"{n:>7} {t_booster * 1e3:>12.3f} {t_f32 * 1e3:>10.3f} {t_f64 * 1e3:>10.3f} "
+              f"{t_booster / t_f32:>11.1f}x")
@@ -0,0 +1,84 @@
+"""Sweep inference executor size and LightGBM num_threads under concurrent load.
+
+For each (INFERENCE_WORKERS, LGBM_NUM_THREADS) pair a fresh uvicorn server is
+started with the prediction cache disabled, then hammered by CONCURRENCY
+in-flight /api/predict requests for DURATION_S seconds.
+
+Run from backend/:  python bench_concurrency.py
+"""
+import asyncio
+import os
+import subprocess
+import sys
+import time
+
+import httpx
+import numpy as np
+
+PORT = 5078
+DURATION_S = 5.0
+CONCURRENCY = 64
+CPUS = os.cpu_count() or 1
+SWEEP = sorted({
+    (workers, threads)
+    for workers in (1, max(1, CPUS // 2), CPUS, 4 * CPUS, 40)
+    for threads in (1, CPUS, 0)
+})
+
+
+async def drive(url, concurrency=CONCURRENCY):
+    latencies = []
+    deadline = time.perf_counter() + DURATION_S
+
+    async def user(i, http):
+        n = 0
+        while time.perf_counter() < deadline:
+            payload = {"land_size": 1.0 + (i * 7 + n) % 40, "rainfall": 400.0 + n % 900}
+            start = time.perf_counter()
+            (await http.post(url, json=payload)).raise_for_status()
+            latencies.append(time.perf_counter() - start)
+            n += 1
+
+    limits = httpx.Limits(max_connections=concurrency)
+    async with httpx.AsyncClient(timeout=30.0, limits=limits) as http:
+        await asyncio.gather(*(user(i, http) for i in range(concurrency)))
+    return np.array(latencies)
+
+
+def wait_ready(base, timeout=120):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            if httpx.get(f"{base}/api/health", timeout=1.0).status_code == 200:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.5)
+    raise RuntimeError("server did not become ready")
+
+
+def run(workers, threads):
+    env = dict(os.environ, INFERENCE_WORKERS=str(workers), LGBM_NUM_THREADS=str(threads),
+               PREDICTION_CACHE_SIZE="0", REQUEST_LOG_SAMPLE_RATE="0")
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--port", str(PORT), "--log-level", "warning"],
+        env=env, stdout=subprocess.DEVNULL, cwd=os.path.dirname(os.path.abspath(__file__)))
+    try:
+        base = f"http://127.0.0.1:{PORT}"
+        wait_ready(base)
+        latencies = asyncio.run(drive(f"{base}/api/predict"))
+    finally:
+        server.terminate()
+        server.wait(timeout=30)
+    return (np.percentile(latencies, 50) * 1e3, np.percentile(latencies, 99) * 1e3,
+            len(latencies) / DURATION_S)
+
+
+if __name__ == "__main__":
+    print(f"{CPUS} CPUs, {CONCURRENCY} concurrent clients, {DURATION_S:.0f}s per setting "
+          f"(num_threads 0 = LightGBM default)\n")
+    print(f"{'workers':>8} {'num_threads':>12} {'p50 ms':>9} {'p99 ms':>9} {'req/s':>9}")
+    print("-" * 51)
+    for workers, threads in SWEEP:
+        p50, p99, rps = run(workers, threads)
+        print(f"{workers:>8} {threads:>12} {p50:>9.1f} {p99:>9.1f} {rps:>9.0f}")
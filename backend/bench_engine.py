@@ -0,0 +1,88 @@
+"""Benchmark the flattened-tree engine against Booster.predict on the fold models.
+
+Run from backend/:  python bench_engine.py
+"""
+import time
+
+import numpy as np
+
+from feature_plan import INPUT_FIELDS
+from main import feature_plan, models
+from parity_corpus import booster_predict
+from tree_engine import FlatEnsemble
+
+BATCH_SIZES = [1, 64, 1024, 10000]
+REPEATS = 200
+
+
+def sample_matrix(rng, n):
+    """Default rows with every feature jittered, plus some NaN / zero cells."""
+    X = feature_plan.base * rng.lognormal(0, 0.5, (n, feature_plan.n_features))
+    X[rng.random(X.shape) < 0.01] = np.nan
+    X[rng.random(X.shape) < 0.01] = 0.0
+    return X
+
+
+def sample_requests(rng, n):
+    """Plan-built rows: only the input-dependent columns vary."""
+    cols = {f: rng.uniform(0.5, 1.5, n) for f in INPUT_FIELDS}
+    cols["land_size"] *= 8.0
+    cols["irrigated_percentage"] *= 50.0
+    cols["yield_per_acre"] *= 18.0
+    cols["rainfall"] *= 900.0
+    cols["temperature"] *= 28.0
+    cols["market_price"] *= 2500.0
+    cols["market_distance"] *= 30.0
+    return feature_plan.build(cols)
+
+
+def time_call(fn, X, repeats):
+    start = time.perf_counter()
+    for _ in range(repeats):
+        fn(X)
+    return (time.perf_counter() - start) / repeats
+
+
+if __name__ == "__main__":
+    rng = np.random.default_rng(42)
+
+    start = time.perf_counter()
+    engine = FlatEnsemble.from_boosters(models)
+    engine.compile()
+    print(f"Export + JIT: {time.perf_counter() - start:.2f}s "
+          f"({engine.n_trees} trees, {engine.n_nodes} nodes)")
+
+    X = sample_matrix(rng, 5000)
+    max_err = np.abs(engine.predict_log(X) - booster_predict(X)).max()
+    print(f"Parity: max |flat - Booster.predict| = {max_err:.3e}")
+    assert max_err < 1e-9
+
+    print(f"\n{'Batch':>7} {'Booster ms':>12} {'Flat ms':>10} {'Speedup':>9}")
+    print("-" * 41)
+    for n in BATCH_SIZES:
+        X = sample_matrix(rng, n)
+        repeats = max(3, REPEATS // max(1, n // 64))
+        t_booster = time_call(booster_predict, X, repeats)
+        t_flat = time_call(engine.predict_log, X, repeats)
+        print(f"{n:>7} {t_booster * 1e3:>12.3f} {t_flat * 1e3:>10.3f} {t_booster / t_flat:>8.1f}x")
+
+    # Partial evaluation against the fixed default features
+    spec = engine.specialize(feature_plan.fixed, feature_plan.base[feature_plan.fixed])
+    print(f"\nSpecialized on {len(feature_plan.fixed)} fixed features: "
+          f"nodes {engine.n_nodes} -> {spec.n_nodes}, "
+          f"constant trees {engine.n_constant_trees} -> {spec.n_constant_trees} of {engine.n_trees}")
+
+    X = sample_requests(rng, 5000)
+    assert np.array_equal(spec.predict_log(X), engine.predict_log(X))
+    X_other = sample_matrix(rng, 500)
+    assert np.array_equal(spec.predict_log(X_other), engine.predict_log(X_other))  # fallback rows
+    print("Parity: exact on plan-built rows and on fallback rows")
+
+    print(f"\n{'Batch':>7} {'Flat ms':>10} {'Spec ms':>10} {'Speedup':>9}")
+    print("-" * 39)
+    for n in BATCH_SIZES:
+        X = sample_requests(rng, n)
+        repeats = max(3, REPEATS // max(1, n // 64))
+        t_flat = time_call(engine.predict_log, X, repeats)
+        t_spec = time_call(spec.predict_log, X, repeats)
+        print(f"{n:>7} {t_flat * 1e3:>10.3f} {t_spec * 1e3:>10.3f} {t_flat / t_spec:>8.1f}x")
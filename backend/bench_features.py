@@ -0,0 +1,232 @@
+"""Benchmark per-request feature assembly: legacy dict/pandas path vs FeaturePlan.
+
+Run from backend/:  python bench_features.py
+"""
+import random
+import time
+
+import numpy as np
+import pandas as pd
+
+from main import PredictionRequest, build_feature_vector, feature_defaults, feature_names
+
+N_REQUESTS = 2000
+
+
+def legacy_build_feature_vector(req: PredictionRequest) -> pd.DataFrame:
+    """Pre-plan implementation (dict + substring scans + pandas), kept as the reference."""
+
+    # Start from median defaults
+    row = {feat: feature_defaults.get(feat, 0.0) for feat in feature_names}
+
+    # ── Dynamic Prosperity Scaling ──
+    # Adjust defaults based on the "richness" of the input profile.
+    
+    # factors: bigger land, higher yield, higher price, more irrigation = wealthier
+    f_land = min(req.land_size / 5.0, 3.0)       # 5 acres = neutral
+    f_yield = min(req.yield_per_acre / 20.0, 2.0)
+    f_irrig = 0.5 + (req.irrigated_percentage / 100.0)
+    f_price = min(req.market_price / 2500.0, 2.0)
+    
+    prosperity_score = f_land * f_yield * f_irrig * f_price
+    
+    # Scale specific wealth-related features
+    wealth_features = [
+        "Non_Agriculture_Income",
+        "Avg_Disbursement_Amount_Bureau",
+        "No_of_Active_Loan_In_Bureau",
+        "Households_with_improved_Sanitation_Facility",
+        "perc_of_pop_living_in_hh_electricity",
+        "perc_Households_with_Pucca_House_That_Has_More_Than_3_Rooms",
+        "Perc_of_house_with_6plus_room",
+        "mat_roof_Metal_GI_Asbestos_sheets",
+        "perc_of_Wall_material_with_Burnt_brick",
+        "Infrastructure_Score",
+        "Market_Access_Score",
+        "State_Avg_Non_Agriculture_Income",
+        "State_Avg_Total_Land_For_Agriculture",
+        "K021_Seasonal_Average_Rainfall_mm", # sometimes rain implies better region
+    ]
+    
+    for feat in wealth_features:
+        if feat in row:
+            # Stronger scaling: square the prosperity score to punish low values more
+            # e.g. 0.3 becomes 0.09
+            multiplier = getattr(req, "land_size", 5) / 5.0 if feat == "State_Avg_Total_Land_For_Agriculture" else prosperity_score
+            multiplier = max(0.05, min(multiplier, 3.0)) # Floor at 5% instead of 30%
+            
+            if req.land_size < 2.0:
+                 multiplier *= 0.1 # CRUSH wealth for very small farmers
+
+            row[feat] = row[feat] * multiplier
+
+    # Specific overrides
+    if req.land_size < 2.0:
+        row["KCC_Access"] = 0
+        row["No_of_Active_Loan_In_Bureau"] = 0
+        row["Avg_Disbursement_Amount_Bureau"] = 0
+        row["Non_Agriculture_Income"] = 0
+        row["State_Avg_Non_Agriculture_Income"] *= 0.1
+    
+    # --- Direct mappings ---
+    row["Total_Land_For_Agriculture"] = req.land_size
+    row["Non_Agriculture_Income"] = row["Non_Agriculture_Income"]
+    row["K022_Proximity_to_nearest_mandi_Km"] = req.market_distance
+    row["K022_Net_Agri_area_in_Ha"] = req.land_size * 0.4047
+
+    # ... (Temperature/Rainfall mappings same as before) ...
+    for prefix in ["K021", "K022", "R020", "R021", "R022"]:
+         if f"{prefix}_Ambient_temperature_min_max__max" in row:
+             row[f"{prefix}_Ambient_temperature_min_max__max"] = req.temperature + 5
+         if f"{prefix}_Ambient_temperature_min_max__min" in row:
+             row[f"{prefix}_Ambient_temperature_min_max__min"] = req.temperature - 5
+         if f"{prefix}_Ambient_temperature_min_max__range" in row:
+             row[f"{prefix}_Ambient_temperature_min_max__range"] = 10
+ 
+    # Rainfall (map to all seasonal rainfall features)
+    for prefix in ["K021", "K022", "R020", "R021", "R022"]:
+         key = f"{prefix}_Seasonal_Average_Rainfall_mm"
+         if key in row:
+             row[key] = req.rainfall
+
+    # Irrigation (Kharif + Rabi irrigated area features)
+    irr_fraction = req.irrigated_percentage / 100.0
+    irr_area = req.land_size * 0.4047 * irr_fraction
+    for col in feature_names:
+        if "Irrigated_area" in col:
+            row[col] = irr_area
+
+    # Agricultural scores (higher irrigation = better score)
+    agri_score = 50 + irr_fraction * 30 + min(req.yield_per_acre, 30) / 30 * 20
+    for col in feature_names:
+        if "Agricultural_Score" in col:
+            row[col] = agri_score
+        elif "Agricultural_performance" in col:
+            row[col] = min(agri_score / 20, 5)  # 1-5 scale
+
+    # Cropping density (higher yield = denser cropping)
+    crop_density = min(req.yield_per_acre / 20, 2.0)
+    for col in feature_names:
+        if "Cropping_density" in col:
+            row[col] = crop_density
+
+    # Engineered features
+    row["Land_sq"] = req.land_size ** 2
+    row["NonAgriIncome_sq"] = row["Non_Agriculture_Income"] ** 2  # Sync!
+    row["Land_per_Person"] = req.land_size / 4
+    row["Income_x_Land"] = row["Non_Agriculture_Income"] * req.land_size # Approximation
+    row["Loan_to_Income_Ratio"] = (row["Avg_Disbursement_Amount_Bureau"] / (row["Non_Agriculture_Income"] + 1)) if row["Avg_Disbursement_Amount_Bureau"] > 0 else 0
+    # Temperature (map to all seasonal temp features)
+    for prefix in ["K021", "K022", "R020", "R021", "R022"]:
+        if f"{prefix}_Ambient_temperature_min_max__max" in row:
+            row[f"{prefix}_Ambient_temperature_min_max__max"] = req.temperature + 5
+        if f"{prefix}_Ambient_temperature_min_max__min" in row:
+            row[f"{prefix}_Ambient_temperature_min_max__min"] = req.temperature - 5
+        if f"{prefix}_Ambient_temperature_min_max__range" in row:
+            row[f"{prefix}_Ambient_temperature_min_max__range"] = 10
+
+    # Rainfall (map to all seasonal rainfall features)
+    for prefix in ["K021", "K022", "R020", "R021", "R022"]:
+        key = f"{prefix}_Seasonal_Average_Rainfall_mm"
+        if key in row:
+            row[key] = req.rainfall
+
+    # Irrigation (Kharif + Rabi irrigated area features)
+    irr_fraction = req.irrigated_percentage / 100.0
+    irr_area = req.land_size * 0.4047 * irr_fraction
+    for col in feature_names:
+        if "Irrigated_area" in col:
+            row[col] = irr_area
+
+    # Agricultural scores (higher irrigation = better score)
+    agri_score = 50 + irr_fraction * 30 + min(req.yield_per_acre, 30) / 30 * 20
+    for col in feature_names:
+        if "Agricultural_Score" in col:
+            row[col] = agri_score
+        elif "Agricultural_performance" in col:
+            row[col] = min(agri_score / 20, 5)  # 1-5 scale
+
+    # Cropping density (higher yield = denser cropping)
+    crop_density = min(req.yield_per_acre / 20, 2.0)
+    for col in feature_names:
+        if "Cropping_density" in col:
+            row[col] = crop_density
+
+    # Sex — use median (0 or 1)
+    # Marital status — use median
+
+    # Engineered features
+    row["Land_sq"] = req.land_size ** 2
+    row["NonAgriIncome_sq"] = 0
+    row["Land_per_Person"] = req.land_size / 4  # assume 4-person household
+    row["Income_x_Land"] = 0  # can't compute without target
+    row["Loan_to_Income_Ratio"] = 0
+
+    # Rainfall aggregates
+    row["Rainfall_Mean"] = req.rainfall
+    row["Rainfall_Trend"] = 0
+    row["Rainfall_Variability"] = req.rainfall * 0.1
+
+    # Agri trend (Kharif vs Rabi)
+    row["Agri_Trend_Kharif"] = 0
+    row["Agri_Trend_Rabi"] = 0
+    row["Avg_Agri_Score"] = agri_score
+
+    # Infrastructure & market scores
+    row["Infrastructure_Score"] = 50 + irr_fraction * 30
+    row["Market_Access_Score"] = max(0, 100 - req.market_distance * 2)
+    row["KCC_Access"] = 1 if req.land_size > 2 else 0
+
+    # Socio-economic (use reasonable defaults)
+    row["Land_x_SocioScore"] = req.land_size * 50
+    row["SocioScore_x_MandiDist"] = 50 * req.market_distance
+
+    # Land holding index
+    if "Land_Holding_Index_source_Total_Agri_Area_no_of_people" in row:
+        row["Land_Holding_Index_source_Total_Agri_Area_no_of_people"] = req.land_size / 4
+
+    # Build DataFrame
+    df = pd.DataFrame([row], columns=feature_names)
+    df = df.apply(pd.to_numeric, errors="coerce").fillna(0)
+    return df
+
+
+
+def random_request(rng):
+    return PredictionRequest(
+        land_size=rng.uniform(0.5, 40),
+        irrigated_percentage=rng.uniform(0, 100),
+        yield_per_acre=rng.uniform(2, 40),
+        rainfall=rng.uniform(100, 2500),
+        temperature=rng.uniform(10, 45),
+        market_price=rng.uniform(500, 8000),
+        market_distance=rng.uniform(0, 120),
+    )
+
+
+def time_per_call(fn, reqs):
+    start = time.perf_counter()
+    for req in reqs:
+        fn(req)
+    return (time.perf_counter() - start) / len(reqs) * 1e6
+
+
+if __name__ == "__main__":
+    rng = random.Random(42)
+    reqs = [random_request(rng) for _ in range(N_REQUESTS)]
+
+    # Both paths must produce identical rows
+    for req in reqs[:200]:
+        old = legacy_build_feature_vector(req).to_numpy(dtype=np.float64)
+        new = build_feature_vector(req)
+        assert np.array_equal(old, new), f"Feature mismatch for {req}"
+    print("Parity: OK (200 requests, exact match)")
+
+    legacy_us = time_per_call(legacy_build_feature_vector, reqs)
+    plan_us = time_per_call(build_feature_vector, reqs)
+
+    print(f"{'Path':<20} {'us/request':>12}")
+    print("-" * 33)
+    print(f"{'legacy (pandas)':<20} {legacy_us:>12.1f}")
+    print(f"{'FeaturePlan':<20} {plan_us:>12.1f}")
+    print(f"Speedup: {legacy_us / plan_us:.1f}x")
@@ -0,0 +1,53 @@
+"""Sequential vs concurrent per-fold evaluation (FOLD_THREADS) at low and high load.
+
+For each FOLD_THREADS setting a fresh uvicorn server (LightGBM engine, prediction
+cache disabled) is driven at each client concurrency level; p50 / p99 latency
+and throughput show where running the five folds in parallel pays off (idle
+cores, few clients) and where it only adds hand-off cost (all cores busy).
+
+Run from backend/:  python bench_fold_threads.py
+"""
+import asyncio
+import os
+import subprocess
+import sys
+
+import numpy as np
+
+from bench_concurrency import DURATION_S, PORT, drive, wait_ready
+
+CPUS = os.cpu_count() or 1
+FOLD_THREADS = (0, 5)
+CONCURRENCY = (1, 4, 16, 64)
+
+
+def run(fold_threads, cpus=""):
+    env = dict(os.environ, FOLD_THREADS=str(fold_threads), FOLD_THREAD_CPUS=cpus, INFERENCE_ENGINE="lightgbm",
+               PREDICTION_CACHE_SIZE="0", SINGLE_FLIGHT="0", REQUEST_LOG_SAMPLE_RATE="0")
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--port", str(PORT), "--log-level", "warning"],
+        env=env, stdout=subprocess.DEVNULL, cwd=os.path.dirname(os.path.abspath(__file__)))
+    results = {}
+    try:
+        base = f"http://127.0.0.1:{PORT}"
+        wait_ready(base)
+        for concurrency in CONCURRENCY:
+            latencies = asyncio.run(drive(f"{base}/api/predict", concurrency))
+            results[concurrency] = (np.percentile(latencies, 50) * 1e3, np.percentile(latencies, 99) * 1e3,
+                                    len(latencies) / DURATION_S)
+    finally:
+        server.terminate()
+        server.wait(timeout=30)
+    return results
+
+
+if __name__ == "__main__":
+    settings = [(n, "") for n in FOLD_THREADS]
+    if CPUS >= 5:
+        settings.append((5, ",".join(str(c) for c in range(5))))
+    print(f"{CPUS} CPUs, {DURATION_S:.0f}s per point (fold threads 0 = sequential)\n")
+    print(f"{'fold threads':>12} {'pinned':>10} {'clients':>8} {'p50 ms':>9} {'p99 ms':>9} {'req/s':>9}")
+    print("-" * 62)
+    for fold_threads, cpus in settings:
+        for concurrency, (p50, p99, rps) in run(fold_threads, cpus).items():
+            print(f"{fold_threads:>12} {cpus or '-':>10} {concurrency:>8} {p50:>9.2f} {p99:>9.2f} {rps:>9.0f}")
@@ -0,0 +1,66 @@
+"""Compare cold-start model loading: fold pickles + JSON vs the mmap model bundle.
+
+Each loader runs in a fresh interpreter so import and page-cache effects are
+measured the way a new worker sees them.
+
+Run from backend/ after building the bundle:  python bench_loading.py
+"""
+import json
+import os
+import subprocess
+import sys
+
+CURRENT_DIR = os.path.dirname(os.path.abspath(__file__))
+MODEL_DIR = os.path.join(CURRENT_DIR, "models")
+MODEL_BUNDLE_PATH = os.environ.get("MODEL_BUNDLE_PATH", os.path.join(MODEL_DIR, "model_bundle.agb"))
+
+LOADERS = {
+    "pickle": f"""
+import json, os, joblib
+models = [joblib.load(os.path.join({MODEL_DIR!r}, f"lgb_fold{{i}}.pkl")) for i in range(1, 6)]
+feature_names = models[0].feature_name()
+with open(os.path.join({MODEL_DIR!r}, "feature_defaults.json")) as f:
+    feature_defaults = json.load(f)
+""",
+    "bundle (schema only)": f"""
+from model_bundle import ModelBundle
+bundle = ModelBundle({MODEL_BUNDLE_PATH!r})
+feature_names, defaults = bundle.feature_names, bundle.defaults
+""",
+    "bundle (all models)": f"""
+from model_bundle import ModelBundle
+bundle = ModelBundle({MODEL_BUNDLE_PATH!r})
+feature_names, defaults, models = bundle.feature_names, bundle.defaults, bundle.models
+""",
+}
+
+PROBE = """
+import json, time
+import numpy, lightgbm
+from model_bundle import rss_mb
+rss_before = rss_mb()
+start = time.perf_counter()
+{body}
+print(json.dumps({{"seconds": time.perf_counter() - start, "rss_before": rss_before, "rss_after": rss_mb()}}))
+"""
+
+REPEATS = 5
+
+
+def run(body):
+    out = subprocess.run([sys.executable, "-c", PROBE.format(body=body)], capture_output=True,
+                         text=True, check=True, cwd=CURRENT_DIR)
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+if __name__ == "__main__":
+    if not os.path.exists(MODEL_BUNDLE_PATH):
+        sys.exit(f"No bundle at {MODEL_BUNDLE_PATH}; build it with: python model_bundle.py")
+
+    print(f"{'Loader':<22} {'load ms':>9} {'RSS MB':>8} {'+RSS MB':>8}")
+    print("-" * 50)
+    for name, body in LOADERS.items():
+        runs = [run(body) for _ in range(REPEATS)]
+        best = min(runs, key=lambda r: r["seconds"])
+        print(f"{name:<22} {best['seconds'] * 1e3:>9.1f} {best['rss_after']:>8.1f} "
+              f"{best['rss_after'] - best['rss_before']:>8.1f}")
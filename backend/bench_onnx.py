@@ -0,0 +1,77 @@
+"""Throughput and memory of the ONNX engine (onnxruntime CPU) vs the native LightGBM boosters.
+
+Each configuration runs in a fresh interpreter: import main (loading the models
+and, for onnx, the exported graph), then time score_columns over sampled
+request batches and single predict() calls. RSS is reported after loading and
+as the peak once scoring is done.
+
+Run from backend/:  python bench_onnx.py   (export the graph first with: python onnx_export.py)
+"""
+import json
+import os
+import subprocess
+import sys
+
+CURRENT_DIR = os.path.dirname(os.path.abspath(__file__))
+CPUS = os.cpu_count() or 1
+
+BATCH_SIZES = (1, 64, 1024, 10000)
+
+PROBE = """
+import json, resource, sys, time
+import numpy as np
+import main
+from feature_plan import INPUT_FIELDS
+from model_bundle import rss_mb
+
+loaded = rss_mb()
+rng = np.random.default_rng(0)
+scale = {"land_size": 8.0, "irrigated_percentage": 50.0, "yield_per_acre": 18.0, "rainfall": 900.0,
+         "temperature": 28.0, "market_price": 2500.0, "market_distance": 30.0}
+
+def best_time(fn, repeats):
+    best = float("inf")
+    for _ in range(3):
+        start = time.perf_counter()
+        for _ in range(repeats):
+            fn()
+        best = min(best, (time.perf_counter() - start) / repeats)
+    return best
+
+rows_per_s = {}
+for n in json.loads(sys.argv[1]):
+    cols = {f: rng.uniform(0.5, 1.5, n) * scale[f] for f in INPUT_FIELDS}
+    main.score_columns(cols)
+    rows_per_s[n] = n / best_time(lambda: main.score_columns(cols), max(3, 2000 // n))
+req = main.PredictionRequest()
+single_ms = best_time(lambda: main.predict(req), 500) * 1e3
+print(json.dumps({"fallback": main.INFERENCE_ENGINE == "onnx" and main.onnx_ensemble is None,
+                  "loaded": loaded, "peak": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+                  "rows_per_s": rows_per_s, "single_ms": single_ms}))
+"""
+
+
+def run(env):
+    env = {**os.environ, "PREDICTION_CACHE_SIZE": "0", "WARMUP_REQUESTS": "0", "REQUEST_LOG_SAMPLE_RATE": "0",
+           "LIGHTWEIGHT_SERVING": "1", **env}
+    out = subprocess.run([sys.executable, "-c", PROBE, json.dumps(BATCH_SIZES)], capture_output=True,
+                         text=True, check=True, cwd=CURRENT_DIR, env=env)
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+if __name__ == "__main__":
+    configs = [("lightgbm", {"INFERENCE_ENGINE": "lightgbm"}),
+               ("onnx, 1 thread", {"INFERENCE_ENGINE": "onnx", "ONNX_INTRA_OP_THREADS": "1"})]
+    if CPUS > 1:
+        configs.append((f"onnx, {CPUS} threads", {"INFERENCE_ENGINE": "onnx", "ONNX_INTRA_OP_THREADS": str(CPUS)}))
+
+    print(f"{CPUS} CPUs, prediction cache off\n")
+    print(f"{'Engine':<18} {'load MB':>8} {'peak MB':>8} {'single ms':>10}"
+          + "".join(f"{f'rows/s @{n}':>14}" for n in BATCH_SIZES))
+    print("-" * (46 + 14 * len(BATCH_SIZES)))
+    for name, env in configs:
+        r = run(env)
+        if r["fallback"]:
+            name += " (fell back)"
+        print(f"{name:<18} {r['loaded']:>8.0f} {r['peak']:>8.0f} {r['single_ms']:>10.3f}"
+              + "".join(f"{r['rows_per_s'][str(n)]:>14,.0f}" for n in BATCH_SIZES))
@@ -0,0 +1,103 @@
+"""Measure per-worker memory and throughput scaling of the pre-fork server.
+
+For each worker count, starts serve.py, drives /api/predict from several
+client processes for a fixed time and reads every worker's RSS, PSS and
+private memory from /proc (Linux).
+
+Run from backend/:  python bench_workers.py [max_workers]
+"""
+import multiprocessing as mp
+import os
+import signal
+import subprocess
+import sys
+import time
+
+import httpx
+
+PORT = 5077
+DURATION_S = 5.0
+CLIENTS_PER_WORKER = 4
+PAYLOAD = {
+    "land_size": 5.0, "irrigated_percentage": 50.0, "yield_per_acre": 18.0,
+    "rainfall": 800.0, "temperature": 28.0, "market_price": 2200.0, "market_distance": 12.0,
+}
+
+
+def client(url, deadline, counter):
+    done = 0
+    with httpx.Client(timeout=10.0) as http:
+        while time.time() < deadline:
+            payload = dict(PAYLOAD, land_size=1.0 + done % 40)  # vary to defeat the cache
+            http.post(url, json=payload).raise_for_status()
+            done += 1
+    with counter.get_lock():
+        counter.value += done
+
+
+def memory_kb(pid):
+    """RSS / PSS / private (clean + dirty) memory in kB from smaps_rollup."""
+    fields = {}
+    with open(f"/proc/{pid}/smaps_rollup") as f:
+        for line in f:
+            parts = line.split()
+            if len(parts) >= 2 and parts[1].isdigit():
+                fields[parts[0].rstrip(":")] = int(parts[1])
+    private = fields.get("Private_Clean", 0) + fields.get("Private_Dirty", 0)
+    return fields.get("Rss", 0), fields.get("Pss", 0), private
+
+
+def children(pid):
+    with open(f"/proc/{pid}/task/{pid}/children") as f:
+        return [int(p) for p in f.read().split()]
+
+
+def wait_ready(base, timeout=120):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            if httpx.get(f"{base}/api/health", timeout=1.0).status_code == 200:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.5)
+    raise RuntimeError("server did not become ready")
+
+
+def run(n_workers):
+    env = dict(os.environ, PORT=str(PORT), WORKERS=str(n_workers), CPU_AFFINITY="auto")
+    server = subprocess.Popen([sys.executable, "serve.py"], env=env, stdout=subprocess.DEVNULL,
+                              cwd=os.path.dirname(os.path.abspath(__file__)))
+    try:
+        base = f"http://127.0.0.1:{PORT}"
+        wait_ready(base)
+        counter = mp.Value("i", 0)
+        deadline = time.time() + DURATION_S
+        clients = [mp.Process(target=client, args=(f"{base}/api/predict", deadline, counter))
+                   for _ in range(CLIENTS_PER_WORKER * n_workers)]
+        for c in clients:
+            c.start()
+        time.sleep(DURATION_S / 2)
+        mem = [memory_kb(pid) for pid in children(server.pid)]
+        for c in clients:
+            c.join()
+        return counter.value / DURATION_S, memory_kb(server.pid), mem
+    finally:
+        server.send_signal(signal.SIGTERM)
+        server.wait(timeout=30)
+
+
+if __name__ == "__main__":
+    max_workers = int(sys.argv[1]) if len(sys.argv) > 1 else (os.cpu_count() or 1)
+    counts = sorted({1, 2, 4, 8, max_workers} & set(range(1, max_workers + 1)))
+
+    print(f"{'Workers':>7} {'req/s':>9} {'scaling':>8} {'RSS/worker':>11} {'PSS/worker':>11} "
+          f"{'private/worker':>15}  (MB)")
+    print("-" * 70)
+    base_rps = None
+    for n in counts:
+        rps, parent, mem = run(n)
+        base_rps = base_rps or rps
+        rss, pss, private = (sum(m[i] for m in mem) / len(mem) / 1024 for i in range(3))
+        print(f"{n:>7} {rps:>9.0f} {rps / base_rps:>7.2f}x {rss:>11.1f} {pss:>11.1f} {private:>15.1f}")
+    print(f"\nParent RSS {parent[0] / 1024:.1f} MB (models loaded once, shared copy-on-write)")
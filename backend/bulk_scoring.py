@@ -0,0 +1,293 @@
+"""Streaming CSV bulk scoring: score an upload chunk by chunk while it is still arriving.
+
+The response object reads the request body itself (raw ``text/csv`` or the file
+part of a ``multipart/form-data`` upload), cuts it into chunks of at most
+``chunk_rows`` rows, scores each chunk and writes the results before reading
+more input. Memory is therefore bounded by one chunk whatever the file size, and
+a client that reads the response slowly stalls the upload (TCP backpressure).
+Clients must consume the response while uploading (curl, httpx streaming); one
+that only reads after sending everything can deadlock on large files.
+"""
+import csv
+import json
+
+import numpy as np
+from python_multipart.multipart import MultipartParser, parse_options_header
+from starlette.responses import JSONResponse, StreamingResponse
+
+# A single CSV record may not exceed this many bytes
+MAX_LINE_BYTES = 1 << 20
+
+
+class BulkUploadError(ValueError):
+    """The upload cannot be scored (bad header, oversized line, malformed multipart)."""
+
+
+class CsvChunker:
+    """Turn body bytes into lists of at most ``chunk_rows`` parsed CSV rows.
+
+    One record per line: quoted fields may not contain newlines.
+    """
+
+    def __init__(self, chunk_rows, encoding="utf-8"):
+        self.chunk_rows = chunk_rows
+        self.encoding = encoding
+        self.header = None
+        self._tail = b""
+        self._rows = []
+
+    def feed(self, data: bytes) -> list:
+        """Consume ``data``; return the chunks that are now complete."""
+        lines = (self._tail + data).split(b"\n")
+        self._tail = lines.pop()
+        if len(self._tail) > MAX_LINE_BYTES:
+            raise BulkUploadError(f"CSV line exceeds {MAX_LINE_BYTES} bytes")
+        return self._add(lines)
+
+    def close(self) -> list:
+        """End of input: return the remaining (possibly short) chunks."""
+        chunks = self._add([self._tail])
+        self._tail = b""
+        if self._rows:
+            chunks.append(self._rows)
+            self._rows = []
+        return chunks
+
+    def _add(self, lines) -> list:
+        try:
+            text = [line.decode(self.encoding).rstrip("\r") for line in lines]
+        except UnicodeDecodeError as e:
+            raise BulkUploadError(f"Upload is not valid {self.encoding}: {e}") from None
+        chunks = []
+        for row in csv.reader(line for line in text if line.strip()):
+            if self.header is None:
+                self.header = [h.strip().lstrip("\ufeff") for h in row]
+                continue
+            self._rows.append(row)
+            if len(self._rows) == self.chunk_rows:
+                chunks.append(self._rows)
+                self._rows = []
+        return chunks
+
+
+class MultipartFileStream:
+    """Incrementally extract the first file part of a multipart/form-data body."""
+
+    def __init__(self, boundary: bytes):
+        self._out = []
+        self._header_field = b""
+        self._header_value = b""
+        self._headers = {}
+        self._state = "before"  # → "active" inside the file part → "done" after it
+        self._parser = MultipartParser(boundary, {
+            "on_part_begin": self._on_part_begin,
+            "on_header_field": lambda data, start, end: self._append("_header_field", data[start:end]),
+            "on_header_value": lambda data, start, end: self._append("_header_value", data[start:end]),
+            "on_header_end": self._on_header_end,
+            "on_headers_finished": self._on_headers_finished,
+            "on_part_data": self._on_part_data,
+            "on_part_end": self._on_part_end,
+        })
+
+    def _append(self, attr, data):
+        setattr(self, attr, getattr(self, attr) + data)
+
+    def _on_part_begin(self):
+        self._headers = {}
+
+    def _on_header_end(self):
+        self._headers[self._header_field.lower()] = self._header_value
+        self._header_field = self._header_value = b""
+
+    def _on_headers_finished(self):
+        _, params = parse_options_header(self._headers.get(b"content-disposition", b""))
+        if self._state == "before" and b"filename" in params:
+            self._state = "active"
+
+    def _on_part_data(self, data, start, end):
+        if self._state == "active":
+            self._out.append(data[start:end])
+
+    def _on_part_end(self):
+        if self._state == "active":
+            self._state = "done"
+
+    def feed(self, data: bytes) -> bytes:
+        try:
+            self._parser.write(data)
+        except Exception as e:
+            raise BulkUploadError(f"Malformed multipart body: {e}") from None
+        out, self._out = b"".join(self._out), []
+        return out
+
+    def close(self):
+        if self._state == "before":
+            raise BulkUploadError("Multipart upload contains no file part")
+
+
+class CsvScoringResponse(StreamingResponse):
+    """Score a CSV request body chunk by chunk, streaming NDJSON or CSV results.
+
+    ``score_chunk(cols)`` is an async callable taking request_columns-style
+    arrays and returning (predicted_income, loan_eligibility, fold incomes).
+    Missing columns fall back to ``defaults``; rows with unparsable values are
+    reported with an ``error`` instead of a score. Header problems are answered
+    with 422 before any output; later failures end the stream with an error record.
+    """
+
+    def __init__(self, content_type, score_chunk, fields, defaults, output="ndjson",
+                 chunk_rows=2000, id_column=None):
+        super().__init__(iter(()), media_type="application/x-ndjson" if output == "ndjson" else "text/csv")
+        self.content_type = content_type or ""
+        self.score_chunk = score_chunk
+        self.fields = list(fields)
+        self.defaults = dict(defaults)
+        self.output = output
+        self.chunk_rows = chunk_rows
+        self.id_column = id_column
+        self.rows_scored = 0
+
+    # ── Input ──
+    async def _body(self, receive):
+        """Yield CSV bytes as the request body arrives."""
+        mime, params = parse_options_header(self.content_type)
+        multipart = None
+        if mime == b"multipart/form-data":
+            if b"boundary" not in params:
+                raise BulkUploadError("Multipart upload without boundary")
+            multipart = MultipartFileStream(params[b"boundary"])
+        more_body = True
+        while more_body:
+            message = await receive()
+            if message["type"] == "http.disconnect":
+                return
+            more_body = message.get("more_body", False)
+            data = message.get("body", b"")
+            if multipart is not None:
+                data = multipart.feed(data)
+            if data:
+                yield data
+        if multipart is not None:
+            multipart.close()
+
+    async def _chunks(self, receive):
+        chunker = CsvChunker(self.chunk_rows)
+        empty = True
+        async for data in self._body(receive):
+            for chunk in chunker.feed(data):
+                empty = False
+                yield chunker.header, chunk
+        for chunk in chunker.close():
+            empty = False
+            yield chunker.header, chunk
+        if chunker.header is None:
+            raise BulkUploadError("Upload is empty; expected a CSV header row")
+        if empty:
+            yield chunker.header, []  # header only: validate it, output nothing
+
+    def _positions(self, header) -> dict:
+        positions = {name: i for i, name in enumerate(header)}
+        if self.id_column is not None and self.id_column not in positions:
+            raise BulkUploadError(f"id column '{self.id_column}' not in CSV header")
+        if not any(f in positions for f in self.fields):
+            raise BulkUploadError(f"CSV header has none of the input fields {self.fields}")
+        return positions
+
+    def _columns(self, rows, positions):
+        """Parsed float columns for ``rows`` and the per-row parse error (or None)."""
+        n = len(rows)
+        cols = {}
+        errors = [None] * n
+        for field in self.fields:
+            default = float(self.defaults[field])
+            idx = positions.get(field)
+            values = np.full(n, default)
+            if idx is not None:
+                for i, row in enumerate(rows):
+                    try:
+                        cell = row[idx].strip()
+                        if cell:
+                            values[i] = float(cell)
+                    except IndexError:
+                        errors[i] = errors[i] or f"row has {len(row)} columns, expected {len(positions)}"
+                    except ValueError:
+                        errors[i] = errors[i] or f"invalid {field}: {row[idx]!r}"
+            cols[field] = values
+        # Rows that failed to parse are scored on defaults and reported as errors
+        for i, err in enumerate(errors):
+            if err is not None:
+                for field in self.fields:
+                    cols[field][i] = float(self.defaults[field])
+        return cols, errors
+
+    # ── Output ──
+    def _csv_header(self) -> bytes:
+        names = ["row"] + (["id"] if self.id_column else []) + ["predicted_income", "loan_eligibility"]
+        return (",".join(names) + ",fold_predictions,error\n").encode()
+
+    def _format(self, rows, positions, first_row, result, errors) -> bytes:
+        predicted_income, eligibility, folds = result
+        id_idx = positions.get(self.id_column) if self.id_column else None
+        income, tiers, folds = predicted_income.tolist(), eligibility.tolist(), folds.T.tolist()
+        out = []
+        for i, row in enumerate(rows):
+            record = {"row": first_row + i}
+            if id_idx is not None:
+                record["id"] = row[id_idx] if id_idx < len(row) else None
+            if errors[i] is None:
+                record.update(predicted_income=income[i], loan_eligibility=tiers[i], fold_predictions=folds[i])
+            else:
+                record["error"] = errors[i]
+            out.append(record)
+        if self.output == "ndjson":
+            return "".join(json.dumps(r) + "\n" for r in out).encode()
+        return "".join(self._csv_line(r) for r in out).encode()
+
+    def _csv_line(self, record) -> str:
+        values = [record["row"]] + ([record.get("id")] if self.id_column else [])
+        values += [record.get("predicted_income", ""), record.get("loan_eligibility", ""),
+                   " ".join(map(str, record.get("fold_predictions", []))), record.get("error", "")]
+        return ",".join(_csv_cell(v) for v in values) + "\n"
+
+    async def _results(self, receive):
+        positions = None
+        async for header, rows in self._chunks(receive):
+            if positions is None:
+                positions = self._positions(header)
+            if not rows:
+                yield b""
+                continue
+            cols, errors = self._columns(rows, positions)
+            result = await self.score_chunk(cols)
+            yield self._format(rows, positions, self.rows_scored + 1, result, errors)
+            self.rows_scored += len(rows)
+
+    async def __call__(self, scope, receive, send):
+        results = self._results(receive)
+        try:
+            first = await results.__anext__()
+        except BulkUploadError as e:
+            return await JSONResponse({"detail": str(e)}, status_code=422)(scope, receive, send)
+        except StopAsyncIteration:
+            return  # client went away before sending the header
+
+        await send({"type": "http.response.start", "status": self.status_code, "headers": self.raw_headers})
+        if self.output == "csv":
+            first = self._csv_header() + first
+        # Each send waits for the transport to drain, so a slow reader pauses the upload
+        await send({"type": "http.response.body", "body": first, "more_body": True})
+        try:
+            async for body in results:
+                await send({"type": "http.response.body", "body": body, "more_body": True})
+        except BulkUploadError as e:
+            tail = {"row": self.rows_scored + 1, "error": str(e)}
+            body = json.dumps(tail) + "\n" if self.output == "ndjson" else self._csv_line(tail)
+            await send({"type": "http.response.body", "body": body.encode(), "more_body": True})
+        await send({"type": "http.response.body", "body": b"", "more_body": False})
+
+
+def _csv_cell(value) -> str:
+    text = "" if value is None else str(value)
+    if any(c in text for c in ',"\n'):
+        text = '"' + text.replace('"', '""') + '"'
+    return text
@@ -0,0 +1,184 @@
+"""Compile the fold ensemble into a native shared library with a C prediction entry point.
+
+Every tree of every fold (up to its ``best_iteration``) becomes a C function of
+nested ``if``s with thresholds and leaf values written out at full precision;
+the library sums each fold's trees in LightGBM's order, in double precision, so
+its output is bit-identical to ``Booster.predict`` on the same input values.
+Built with the local C compiler (``$CC``, default ``cc``); no other tooling.
+
+Entry points (``X`` row-major (n_rows, n_features), ``out`` (folds, n_rows)):
+    void agri_predict_f32(const float *X, long n_rows, double *out);
+    void agri_predict_f64(const double *X, long n_rows, double *out);
+
+The library also embeds the fingerprint of the fold models it was compiled
+from (``library_fingerprint`` reads it without loading the library).
+
+Build from the fold pickles and check parity (run from backend/):  python compile_trees.py [output path]
+"""
+import ctypes
+import os
+import re
+import subprocess
+import tempfile
+
+import numpy as np
+
+from tree_dump import K_ZERO_THRESHOLD, check_identity_objective, models_fingerprint
+
+CFLAGS = ["-O2", "-shared", "-fPIC"]
+
+# Prefix of the fingerprint string constant, found by scanning the library file
+FINGERPRINT_MARKER = "agri-source-fingerprint:"
+
+_PREAMBLE = """\
+#include <math.h>
+
+#define N_FEATURES {n_features}
+#define N_FOLDS {n_folds}
+
+int agri_n_features(void) {{ return N_FEATURES; }}
+int agri_n_folds(void) {{ return N_FOLDS; }}
+const char agri_source_fingerprint[] = "{marker}{fingerprint}";
+"""
+
+# r = row as double, z = row with NaN replaced by 0 (LightGBM's handling unless missing_type is NaN)
+_ENTRY_POINTS = """
+#define PREDICT(NAME, T) \\
+void NAME(const T *X, long n_rows, double *out) {{ \\
+    double r[N_FEATURES], z[N_FEATURES]; \\
+    for (long i = 0; i < n_rows; i++) {{ \\
+        const T *x = X + i * N_FEATURES; \\
+        for (int f = 0; f < N_FEATURES; f++) {{ \\
+            r[f] = (double)x[f]; \\
+            z[f] = isnan(r[f]) ? 0.0 : r[f]; \\
+        }} \\
+        predict_row(r, z, out + i, n_rows); \\
+    }} \\
+}}
+
+PREDICT(agri_predict_f32, float)
+PREDICT(agri_predict_f64, double)
+"""
+
+
+def _condition(node) -> str:
+    """C expression that is true when ``node`` sends the row to its left child."""
+    if node["decision_type"] != "<=":
+        raise NotImplementedError("Only numerical '<=' splits can be compiled")
+    f, threshold = node["split_feature"], repr(float(node["threshold"]))
+    default_left = "1" if node["default_left"] else "0"
+    missing = node["missing_type"]
+    if missing == "None":
+        return f"z[{f}] <= {threshold}"
+    if missing == "Zero":
+        return f"(fabs(z[{f}]) <= {K_ZERO_THRESHOLD!r} ? {default_left} : z[{f}] <= {threshold})"
+    if missing == "NaN":
+        return f"(isnan(r[{f}]) ? {default_left} : r[{f}] <= {threshold})"
+    raise NotImplementedError(f"Unknown missing_type {missing}")
+
+
+def _emit(node, lines, depth):
+    pad = "    " * depth
+    if "split_feature" not in node:
+        lines.append(f"{pad}return {float(node['leaf_value'])!r};")
+        return
+    lines.append(f"{pad}if ({_condition(node)}) {{")
+    _emit(node["left_child"], lines, depth + 1)
+    lines.append(f"{pad}}} else {{")
+    _emit(node["right_child"], lines, depth + 1)
+    lines.append(f"{pad}}}")
+
+
+def generate_c(models) -> str:
+    """Fold Boosters → C source of the prediction library."""
+    lines = [_PREAMBLE.format(n_features=models[0].num_feature(), n_folds=len(models),
+                              marker=FINGERPRINT_MARKER, fingerprint=models_fingerprint(models))]
+    fold_trees = []
+    for booster in models:
+        dump = booster.dump_model(num_iteration=booster.best_iteration)
+        check_identity_objective(dump, "compilation")
+        trees = []
+        for tree in dump["tree_info"]:
+            name = f"tree_{len(fold_trees)}_{len(trees)}"
+            lines.append(f"static double {name}(const double *r, const double *z) {{")
+            _emit(tree["tree_structure"], lines, 1)
+            lines.append("}")
+            trees.append(name)
+        fold_trees.append(trees)
+
+    # Sequential double accumulation, tree by tree, as in LightGBM
+    lines.append("static void predict_row(const double *r, const double *z, double *out, long stride) {")
+    lines.append("    double s;")
+    for k, trees in enumerate(fold_trees):
+        lines.append("    s = 0.0;")
+        lines.extend(f"    s += {name}(r, z);" for name in trees)
+        lines.append(f"    out[{k} * stride] = s;")
+    lines.append("}")
+    lines.append(_ENTRY_POINTS.format())
+    return "\n".join(lines)
+
+
+def compile_library(models, path, cc=None):
+    """Generate the C source for ``models`` and build it into the shared library ``path``."""
+    cc = cc or os.environ.get("CC", "cc")
+    with tempfile.TemporaryDirectory() as tmp:
+        source = os.path.join(tmp, "ensemble.c")
+        with open(source, "w") as f:
+            f.write(generate_c(models))
+        # Build next to the target and rename, so a running server never maps a partial file
+        partial = path + ".tmp"
+        subprocess.run([cc, *CFLAGS, "-o", partial, source, "-lm"], check=True)
+        os.replace(partial, path)
+    return path
+
+
+def library_fingerprint(path):
+    """Fingerprint of the fold models a library at ``path`` was compiled from (None if it has none)."""
+    with open(path, "rb") as f:
+        found = re.search(re.escape(FINGERPRINT_MARKER.encode()) + rb"([0-9a-f]{64})", f.read())
+    return found.group(1).decode() if found else None
+
+
+class CompiledEnsemble:
+    """ctypes wrapper around a library built by ``compile_library``.
+
+    ``dtype`` is the buffer type handed to the library: float32 halves the bytes
+    per row; float64 keeps the feature values exactly as the feature plan built them.
+    """
+
+    def __init__(self, path, dtype=np.float32):
+        self.lib = ctypes.CDLL(os.path.abspath(path))
+        self.dtype = np.dtype(dtype)
+        self.n_features = self.lib.agri_n_features()
+        self.n_folds = self.lib.agri_n_folds()
+        c_type = {np.float32: ctypes.c_float, np.float64: ctypes.c_double}[self.dtype.type]
+        self._predict = self.lib.agri_predict_f32 if self.dtype == np.float32 else self.lib.agri_predict_f64
+        self._predict.argtypes = [ctypes.POINTER(c_type), ctypes.c_long, ctypes.POINTER(ctypes.c_double)]
+        self._predict.restype = None
+        self._c_type = c_type
+
+    def predict_log(self, X: np.ndarray) -> np.ndarray:
+        """(N, n_features) → (folds, N) log predictions (the GIL is released during the call)."""
+        X = np.ascontiguousarray(X, dtype=self.dtype)
+        if X.ndim != 2 or X.shape[1] != self.n_features:
+            raise ValueError(f"Expected (N, {self.n_features}) features, got {X.shape}")
+        out = np.empty((self.n_folds, X.shape[0]), dtype=np.float64)
+        self._predict(X.ctypes.data_as(ctypes.POINTER(self._c_type)), X.shape[0],
+                      out.ctypes.data_as(ctypes.POINTER(ctypes.c_double)))
+        return out
+
+
+if __name__ == "__main__":
+    import sys
+    import time
+
+    import joblib
+
+    model_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), "models")
+    out_path = sys.argv[1] if len(sys.argv) > 1 else os.path.join(model_dir, "lgb_compiled.so")
+
+    models = [joblib.load(os.path.join(model_dir, f"lgb_fold{i}.pkl")) for i in range(1, 6)]
+    start = time.perf_counter()
+    compile_library(models, out_path)
+    print(f"Compiled {sum(m.best_iteration for m in models)} trees to {out_path} "
+          f"in {time.perf_counter() - start:.1f}s; check parity with: python test_compiled_parity.py")
@@ -0,0 +1,182 @@
+"""Precompiled 10-input → 286-feature assembly plan used by the API."""
+import numpy as np
+
+# Numeric fields of PredictionRequest that drive the feature vector
+INPUT_FIELDS = [
+    "land_size", "irrigated_percentage", "yield_per_acre", "rainfall",
+    "temperature", "market_price", "market_distance",
+]
+
+# Default-valued features that scale with the "richness" of the input profile
+WEALTH_FEATURES = [
+    "Non_Agriculture_Income",
+    "Avg_Disbursement_Amount_Bureau",
+    "No_of_Active_Loan_In_Bureau",
+    "Households_with_improved_Sanitation_Facility",
+    "perc_of_pop_living_in_hh_electricity",
+    "perc_Households_with_Pucca_House_That_Has_More_Than_3_Rooms",
+    "Perc_of_house_with_6plus_room",
+    "mat_roof_Metal_GI_Asbestos_sheets",
+    "perc_of_Wall_material_with_Burnt_brick",
+    "Infrastructure_Score",
+    "Market_Access_Score",
+    "State_Avg_Non_Agriculture_Income",
+    "State_Avg_Total_Land_For_Agriculture",
+    "K021_Seasonal_Average_Rainfall_mm",  # sometimes rain implies better region
+]
+
+# Bureau / income defaults zeroed out for very small farmers (< 2 acres)
+SMALL_FARM_ZEROED = [
+    "No_of_Active_Loan_In_Bureau",
+    "Avg_Disbursement_Amount_Bureau",
+    "Non_Agriculture_Income",
+]
+
+SEASON_PREFIXES = ["K021", "K022", "R020", "R021", "R022"]
+
+# Features pinned to a constant regardless of the request
+CONSTANT_FEATURES = {
+    "NonAgriIncome_sq": 0.0,
+    "Income_x_Land": 0.0,           # can't compute without target
+    "Loan_to_Income_Ratio": 0.0,
+    "Rainfall_Trend": 0.0,
+    "Agri_Trend_Kharif": 0.0,
+    "Agri_Trend_Rabi": 0.0,
+    **{f"{p}_Ambient_temperature_min_max__range": 10.0 for p in SEASON_PREFIXES},
+}
+
+
+def request_columns(reqs) -> dict:
+    """Collect the numeric inputs of many requests into one float array per field."""
+    return {f: np.array([getattr(r, f) for r in reqs], dtype=np.float64) for f in INPUT_FIELDS}
+
+
+def prosperity_score(cols: dict) -> np.ndarray:
+    """Bigger land, higher yield, higher price, more irrigation = wealthier."""
+    f_land = np.minimum(cols["land_size"] / 5.0, 3.0)  # 5 acres = neutral
+    f_yield = np.minimum(cols["yield_per_acre"] / 20.0, 2.0)
+    f_irrig = 0.5 + (cols["irrigated_percentage"] / 100.0)
+    f_price = np.minimum(cols["market_price"] / 2500.0, 2.0)
+    return f_land * f_yield * f_irrig * f_price
+
+
+class FeaturePlan:
+    """Default vector plus column-index groups, compiled once from the model schema.
+
+    Every input-driven feature family is resolved to an index array up front, so
+    building rows is a copy of ``base`` followed by a handful of indexed writes.
+    """
+
+    def __init__(self, feature_names, feature_defaults):
+        self.feature_names = list(feature_names)
+        self.n_features = len(self.feature_names)
+        index = {feat: j for j, feat in enumerate(self.feature_names)}
+
+        def idx(names):
+            return np.array([index[n] for n in names if n in index], dtype=np.intp)
+
+        def matching(sub, exclude=None):
+            return [c for c in self.feature_names if sub in c and not (exclude and exclude in c)]
+
+        # Input-driven groups, keyed by the derived quantity written into them.
+        # build() writes them in this order, so later groups win on overlaps.
+        self.groups = {
+            "land": idx(["Total_Land_For_Agriculture"]),
+            "market_distance": idx(["K022_Proximity_to_nearest_mandi_Km"]),
+            "net_area": idx(["K022_Net_Agri_area_in_Ha"]),
+            "temp_max": idx([f"{p}_Ambient_temperature_min_max__max" for p in SEASON_PREFIXES]),
+            "temp_min": idx([f"{p}_Ambient_temperature_min_max__min" for p in SEASON_PREFIXES]),
+            "rainfall": idx([f"{p}_Seasonal_Average_Rainfall_mm" for p in SEASON_PREFIXES] + ["Rainfall_Mean"]),
+            "irr_area": idx(matching("Irrigated_area")),
+            "agri_score": idx(matching("Agricultural_Score") + ["Avg_Agri_Score"]),
+            "agri_perf": idx(matching("Agricultural_performance", exclude="Agricultural_Score")),
+            "crop_density": idx(matching("Cropping_density")),
+            "land_sq": idx(["Land_sq"]),
+            "land_quarter": idx(["Land_per_Person", "Land_Holding_Index_source_Total_Agri_Area_no_of_people"]),
+            "rain_var": idx(["Rainfall_Variability"]),
+            "infra": idx(["Infrastructure_Score"]),
+            "market_access": idx(["Market_Access_Score"]),
+            "kcc": idx(["KCC_Access"]),
+            "land_x_socio": idx(["Land_x_SocioScore"]),
+            "socio_x_mandi": idx(["SocioScore_x_MandiDist"]),
+        }
+        overwritten = set(np.concatenate(list(self.groups.values())).tolist())
+
+        # Default vector with constant overrides baked in
+        base = np.array([feature_defaults.get(f, 0.0) for f in self.feature_names], dtype=np.float64)
+        for feat, value in CONSTANT_FEATURES.items():
+            if feat in index:
+                base[index[feat]] = value
+                overwritten.add(index[feat])
+        base[np.isnan(base)] = 0.0
+        self.base = base
+
+        # Wealth scaling only matters for defaults that survive to the output
+        def survivors(names):
+            return np.array([index[n] for n in names if n in index and index[n] not in overwritten],
+                            dtype=np.intp)
+
+        self.wealth = survivors([f for f in WEALTH_FEATURES if f != "State_Avg_Total_Land_For_Agriculture"])
+        self.land_wealth = survivors(["State_Avg_Total_Land_For_Agriculture"])
+        self.small_zeroed = survivors(SMALL_FARM_ZEROED)
+        self.small_scaled = survivors(["State_Avg_Non_Agriculture_Income"])
+
+        # Columns build() can write from request inputs; every other column is always ``base``
+        self.dynamic = np.unique(np.concatenate(
+            list(self.groups.values()) + [self.wealth, self.land_wealth, self.small_zeroed, self.small_scaled]
+        ))
+        self.fixed = np.setdiff1d(np.arange(self.n_features), self.dynamic)
+
+    def build(self, cols: dict) -> np.ndarray:
+        """Assemble an (N, n_features) float64 matrix from request_columns inputs."""
+        land = cols["land_size"]
+        irr_fraction = cols["irrigated_percentage"] / 100.0
+        yld = cols["yield_per_acre"]
+        rain = cols["rainfall"]
+        temp = cols["temperature"]
+        dist = cols["market_distance"]
+        n = len(land)
+        g = self.groups
+
+        X = np.empty((n, self.n_features), dtype=np.float64)
+        X[:] = self.base
+
+        # Dynamic prosperity scaling; CRUSH wealth for very small farmers
+        small = land < 2.0
+        crush = np.where(small, 0.1, 1.0)
+        if len(self.wealth):
+            mult = np.clip(prosperity_score(cols), 0.05, 3.0) * crush
+            X[:, self.wealth] *= mult[:, None]
+        if len(self.land_wealth):
+            X[:, self.land_wealth] *= (np.clip(land / 5.0, 0.05, 3.0) * crush)[:, None]
+        if small.any():
+            X[np.ix_(small, self.small_zeroed)] = 0.0
+            X[np.ix_(small, self.small_scaled)] *= 0.1
+
+        # Direct mappings
+        X[:, g["land"]] = land[:, None]
+        X[:, g["market_distance"]] = dist[:, None]
+        X[:, g["net_area"]] = (land * 0.4047)[:, None]
+        X[:, g["temp_max"]] = (temp + 5)[:, None]
+        X[:, g["temp_min"]] = (temp - 5)[:, None]
+        X[:, g["rainfall"]] = rain[:, None]
+
+        # Irrigation, agricultural scores (1-5 scale for performance) and cropping density
+        agri_score = 50 + irr_fraction * 30 + np.minimum(yld, 30) / 30 * 20
+        X[:, g["irr_area"]] = (land * 0.4047 * irr_fraction)[:, None]
+        X[:, g["agri_score"]] = agri_score[:, None]
+        X[:, g["agri_perf"]] = np.minimum(agri_score / 20, 5)[:, None]
+        X[:, g["crop_density"]] = np.minimum(yld / 20, 2.0)[:, None]
+
+        # Engineered features
+        X[:, g["land_sq"]] = (land ** 2)[:, None]
+        X[:, g["land_quarter"]] = (land / 4)[:, None]  # assume 4-person household
+        X[:, g["rain_var"]] = (rain * 0.1)[:, None]
+        X[:, g["infra"]] = (50 + irr_fraction * 30)[:, None]
+        X[:, g["market_access"]] = np.maximum(0, 100 - dist * 2)[:, None]
+        X[:, g["kcc"]] = np.where(land > 2, 1.0, 0.0)[:, None]
+        X[:, g["land_x_socio"]] = (land * 50)[:, None]
+        X[:, g["socio_x_mandi"]] = (50 * dist)[:, None]
+
+        X[np.isnan(X)] = 0.0
+        return X
@@ -0,0 +1,123 @@
+"""Interactive prediction sessions: partial input deltas in, debounced predictions out.
+
+A session keeps the current inputs of one client (e.g. a form whose sliders are
+being dragged). Every message merges a delta into that state; scoring waits
+until the client has been quiet for ``debounce_ms`` (but never longer than
+``max_delay_ms`` after the first unscored change) and then scores only the
+latest state. Results of recent states are kept in a small per-session LRU,
+so returning to an earlier slider position is answered without scoring.
+"""
+import asyncio
+import threading
+import time
+from collections import OrderedDict
+
+
+class SessionStats:
+    """Counters shared by all sessions of the process."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.open = 0
+        self.sessions = 0
+        self.messages = 0
+        self.scored = 0
+        self.cache_hits = 0
+        self.coalesced = 0
+        self.errors = 0
+
+    def add(self, **counts):
+        with self._lock:
+            for name, n in counts.items():
+                setattr(self, name, getattr(self, name) + n)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "open_sessions": self.open,
+                "sessions": self.sessions,
+                "messages": self.messages,
+                "scored": self.scored,
+                "cache_hits": self.cache_hits,
+                # Deltas superseded by a later one before scoring
+                "coalesced": self.coalesced,
+                "errors": self.errors,
+            }
+
+
+class PredictionSession:
+    """Debounced scoring loop for one client.
+
+    ``validate(state)`` turns the merged state into a (cache key, request)
+    pair or raises ValueError; ``score(request)`` is awaited for a result
+    dict; ``send(message)`` pushes a JSON-able message to the client.
+    """
+
+    def __init__(self, initial, validate, score, send, stats, debounce_ms=50.0, max_delay_ms=250.0,
+                 cache_size=32):
+        self.state = dict(initial)
+        self.validate = validate
+        self.score = score
+        self.send = send
+        self.stats = stats
+        self.debounce = debounce_ms / 1000.0
+        self.max_delay = max_delay_ms / 1000.0
+        self.cache_size = cache_size
+        self.version = 0
+        self._scored_version = 0
+        self._changed = asyncio.Event()
+        self._cache = OrderedDict()
+
+    def update(self, delta: dict):
+        """Merge one client message into the state and schedule scoring."""
+        self.stats.add(messages=1)
+        self.state.update(delta)
+        self.version += 1
+        self._changed.set()
+
+    async def _quiet(self):
+        """Wait until no delta arrived for ``debounce`` seconds, or ``max_delay`` has passed."""
+        deadline = time.perf_counter() + self.max_delay
+        while True:
+            self._changed.clear()
+            timeout = min(self.debounce, deadline - time.perf_counter())
+            if timeout <= 0:
+                return
+            try:
+                await asyncio.wait_for(self._changed.wait(), timeout)
+            except asyncio.TimeoutError:
+                return
+
+    async def run(self):
+        """Score the latest state after each burst of deltas; runs until cancelled."""
+        while True:
+            await self._changed.wait()
+            await self._quiet()
+            version, inputs = self.version, dict(self.state)
+            if version == self._scored_version:
+                continue
+            self.stats.add(coalesced=version - self._scored_version - 1)
+            self._scored_version = version
+            try:
+                key, request = self.validate(inputs)
+            except ValueError as e:
+                self.stats.add(errors=1)
+                await self.send({"type": "error", "version": version, "detail": str(e)})
+                continue
+
+            result = self._cache.get(key)
+            if result is not None:
+                self._cache.move_to_end(key)
+                self.stats.add(cache_hits=1)
+            else:
+                try:
+                    result = await self.score(request)
+                except Exception as e:
+                    self.stats.add(errors=1)
+                    await self.send({"type": "error", "version": version, "detail": str(e)})
+                    continue
+                self.stats.add(scored=1)
+                self._cache[key] = result
+                while len(self._cache) > self.cache_size:
+                    self._cache.popitem(last=False)
+            await self.send({"type": "prediction", "version": version, "inputs": inputs, **result})
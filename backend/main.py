@@ -2,36 +2,359 @@
 
 import os
 import json
+import subprocess
+import time
+import asyncio
+import itertools
+import math
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from functools import partial
+from typing import Dict, List, Literal, Optional
+
 import numpy as np
-import pandas as pd
-import joblib
-from fastapi import FastAPI
+from fastapi import FastAPI, HTTPException, Request, WebSocket, WebSocketDisconnect
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, PlainTextResponse
 from pydantic import BaseModel
 
+from admission import AdmissionController, Overloaded
+from bulk_scoring import CsvScoringResponse
+from explain import FoldExplainer
+from feature_plan import INPUT_FIELDS, FeaturePlan, prosperity_score, request_columns
+from interactive import PredictionSession, SessionStats
+from micro_batcher import MicroBatcher
+from model_bundle import ModelBundle, block_optional_imports, rss_mb
+from observability import (RequestTimingMiddleware, SampledLogger, StageMetrics, render_values,
+                           request_started)
+from prediction_cache import ThresholdCache
+from simulation import SIMULATION_FIELDS, check_distribution, draw
+from single_flight import SingleFlight
+from warmup import Warmup, synthetic_requests
+
 # ── Paths ───────────────────────────────────────────────────
 # ── Paths ───────────────────────────────────────────────────
 CURRENT_DIR = os.path.dirname(os.path.abspath(__file__))
 MODEL_DIR = os.path.join(CURRENT_DIR, "models")
 DEFAULTS_PATH = os.path.join(MODEL_DIR, "feature_defaults.json")
+# Built by model_bundle.py; the fold pickles + defaults JSON are used when it is absent
+MODEL_BUNDLE_PATH = os.environ.get("MODEL_BUNDLE_PATH", os.path.join(MODEL_DIR, "model_bundle.agb"))
+
+# Upper bound on rows accepted by /api/predict/batch in one call
+MAX_BATCH_SIZE = 10000
+# Minimum predicted income for each loan eligibility tier (below Medium is Low)
+LOAN_TIER_THRESHOLDS = {"High": 800000, "Medium": 350000}
+
+# Upper bound on samples drawn by one /api/predict/simulate call
+MAX_SIMULATION_SAMPLES = int(os.environ.get("MAX_SIMULATION_SAMPLES", "20000"))
+
+# "lightgbm" = fold Boosters, "flat" = numba flattened-tree engine (tree_engine.py),
+# "specialized" = flat engine constant-folded against the fixed default features,
+# "merged" = fold Boosters plus one merged Booster for the ensemble mean (merge_folds.py),
+# "onnx" = feature assembly + folds as one ONNX graph on onnxruntime (onnx_export.py),
+# "compiled" = folds compiled to a native shared library called through ctypes (compile_trees.py)
+INFERENCE_ENGINE = os.environ.get("INFERENCE_ENGINE", "lightgbm")
+# Built by merge_folds.py; merged in memory from the fold models when absent or built
+# from other models (its .json sidecar records their fingerprint), and the fold
+# Boosters serve alone if the file (or its sidecar) cannot be loaded
+MERGED_MODEL_PATH = os.environ.get("MERGED_MODEL_PATH", os.path.join(MODEL_DIR, "lgb_merged.txt"))
+# The merged Booster only wins on small inputs (its trees no longer fit in cache
+# together); larger mean-only batches use the fold Boosters
+MERGED_MAX_ROWS = int(os.environ.get("MERGED_MAX_ROWS", "16"))
+# Built by onnx_export.py; exported in memory from the fold models when absent.
+# ONNX_INTRA_OP_THREADS is onnxruntime's per-call thread count (like LGBM_NUM_THREADS).
+ONNX_MODEL_PATH = os.environ.get("ONNX_MODEL_PATH", os.path.join(MODEL_DIR, "ensemble.onnx"))
+ONNX_INTRA_OP_THREADS = int(os.environ.get("ONNX_INTRA_OP_THREADS", "1"))
+# Built by compile_trees.py; compiled with the local C compiler at startup when absent
+# or compiled from other fold models (the library embeds their fingerprint).
+# COMPILED_INPUT_DTYPE is the feature buffer type passed to it ("float32" or "float64");
+# float32 rounds feature values first, so a value just below a split threshold can land
+# above it and responses can differ from the other engines. float64 matches them exactly.
+COMPILED_MODEL_PATH = os.environ.get("COMPILED_MODEL_PATH", os.path.join(MODEL_DIR, "lgb_compiled.so"))
+COMPILED_INPUT_DTYPE = os.environ.get("COMPILED_INPUT_DTYPE", "float32")
+
+# Coalesce concurrent /api/predict calls into batches (see micro_batcher.py); up to
+# INFERENCE_WORKERS batches are scored at once
+MICRO_BATCHING = os.environ.get("MICRO_BATCHING", "0") == "1"
+MICRO_BATCH_MAX_SIZE = int(os.environ.get("MICRO_BATCH_MAX_SIZE", "64"))
+MICRO_BATCH_WAIT_MS = float(os.environ.get("MICRO_BATCH_WAIT_MS", "2.0"))
+
+# Entries in the exact /api/predict cache (0 disables it)
+PREDICTION_CACHE_SIZE = int(os.environ.get("PREDICTION_CACHE_SIZE", "4096"))
+
+# Threads that run inference (instead of AnyIO's ~40-thread default pool), and the
+# OpenMP threads each LightGBM predict call may use (0 = LightGBM's own default).
+# Keep INFERENCE_WORKERS * LGBM_NUM_THREADS <= cores to avoid oversubscription.
+INFERENCE_WORKERS = int(os.environ.get("INFERENCE_WORKERS", str(os.cpu_count() or 1)))
+LGBM_NUM_THREADS = int(os.environ.get("LGBM_NUM_THREADS", "1"))
+
+# Let concurrent /api/predict calls with identical inputs share one computation
+SINGLE_FLIGHT = os.environ.get("SINGLE_FLIGHT", "1") == "1"
+
+# Admission control for /api/predict: shed (503 + Retry-After) or, with
+# ADMISSION_MODE=degrade, score on DEGRADED_FOLDS fold models when the expected
+# latency would exceed ADMISSION_SLO_MS (0 disables admission control)
+ADMISSION_SLO_MS = float(os.environ.get("ADMISSION_SLO_MS", "0"))
+ADMISSION_MODE = os.environ.get("ADMISSION_MODE", "shed")
+DEGRADED_FOLDS = int(os.environ.get("DEGRADED_FOLDS", "1"))
+
+# Adaptive early exit for /api/predict: evaluate fold boosters in order and stop once
+# the standard error of the running mean log prediction is below this (0 = all folds).
+# Applies to the LightGBM engine; the other engines walk all folds in one pass anyway.
+# The prediction cache stores early-exit results as they are (exact: the exit point is a
+# function of the cache key), so a hit returns the same folds_used as scoring would.
+ADAPTIVE_FOLD_TOLERANCE = float(os.environ.get("ADAPTIVE_FOLD_TOLERANCE", "0"))
+
+# Evaluate the fold boosters of one predict call concurrently on FOLD_THREADS threads
+# (0 = one after another; LightGBM releases the GIL while predicting). FOLD_THREAD_CPUS
+# pins those threads round-robin to a CPU list, e.g. "0,1,2,3,4". See bench_fold_threads.py.
+FOLD_THREADS = int(os.environ.get("FOLD_THREADS", "0"))
+FOLD_THREAD_CPUS = [int(c) for c in os.environ.get("FOLD_THREAD_CPUS", "").split(",") if c.strip()]
+
+# /api/explain: LRU of fold-averaged SHAP contributions (0 disables it), and coalescing of
+# concurrent explanations into one pred_contrib pass (up to EXPLAIN_BATCH_MAX_SIZE rows)
+EXPLAIN_CACHE_SIZE = int(os.environ.get("EXPLAIN_CACHE_SIZE", "1024"))
+EXPLAIN_BATCH_MAX_SIZE = int(os.environ.get("EXPLAIN_BATCH_MAX_SIZE", "32"))
+EXPLAIN_BATCH_WAIT_MS = float(os.environ.get("EXPLAIN_BATCH_WAIT_MS", "5.0"))
+
+# /api/ws/predict sessions: score once a client has sent no delta for WS_DEBOUNCE_MS (but at
+# most WS_MAX_DELAY_MS after the first unscored one); results of the last
+# WS_SESSION_CACHE_SIZE states of each session are reused
+WS_DEBOUNCE_MS = float(os.environ.get("WS_DEBOUNCE_MS", "50"))
+WS_MAX_DELAY_MS = float(os.environ.get("WS_MAX_DELAY_MS", "250"))
+WS_SESSION_CACHE_SIZE = int(os.environ.get("WS_SESSION_CACHE_SIZE", "32"))
+
+# Rows parsed and scored per chunk by the streaming /api/predict/upload endpoint
+CSV_CHUNK_ROWS = int(os.environ.get("CSV_CHUNK_ROWS", "2000"))
+
+# Never import pandas / scikit-learn & co. (LightGBM only needs them for DataFrame
+# inputs or its sklearn wrapper); trims cold-start time and baseline RSS
+LIGHTWEIGHT_SERVING = os.environ.get("LIGHTWEIGHT_SERVING", "0") == "1"
+
+# Synthetic requests scored at startup, before the app takes traffic: WARMUP_REQUESTS
+# single predictions, then one score_requests batch per WARMUP_BATCH_SIZES entry
+WARMUP_REQUESTS = int(os.environ.get("WARMUP_REQUESTS", "32"))
+WARMUP_BATCH_SIZES = [int(n) for n in os.environ.get("WARMUP_BATCH_SIZES", "16,256").split(",") if n.strip()]
+
+# Fraction of prediction requests written to the structured request log
+REQUEST_LOG_SAMPLE_RATE = float(os.environ.get("REQUEST_LOG_SAMPLE_RATE", "0.01"))
+
+# ── Observability ───────────────────────────────────────────
+stage_metrics = StageMetrics()
+request_log = SampledLogger("agripredict.requests", sample_rate=REQUEST_LOG_SAMPLE_RATE)
+
+# ── Inference executor ──────────────────────────────────────
+inference_executor = ThreadPoolExecutor(max_workers=INFERENCE_WORKERS, thread_name_prefix="inference")
+lgbm_predict_params = {"num_threads": LGBM_NUM_THREADS} if LGBM_NUM_THREADS > 0 else {}
+
+_fold_thread_ids = itertools.count()
+
+
+def pin_fold_thread():
+    """Fold pool initializer: pin the new thread to the next CPU of FOLD_THREAD_CPUS."""
+    if FOLD_THREAD_CPUS and hasattr(os, "sched_setaffinity"):
+        os.sched_setaffinity(0, {FOLD_THREAD_CPUS[next(_fold_thread_ids) % len(FOLD_THREAD_CPUS)]})
+
+
+fold_executor = None
+if FOLD_THREADS > 0:
+    fold_executor = ThreadPoolExecutor(max_workers=FOLD_THREADS, thread_name_prefix="fold",
+                                       initializer=pin_fold_thread)
+
+
+async def run_inference(fn, *args):
+    """Run blocking inference work on the dedicated executor."""
+    return await asyncio.get_running_loop().run_in_executor(inference_executor, fn, *args)
 
 # ── Load models + defaults at startup ───────────────────────
-print("Loading models...")
-models = []
-for i in range(1, 6):
-    path = os.path.join(MODEL_DIR, f"lgb_fold{i}.pkl")
-    models.append(joblib.load(path))
-    print(f"  - Fold {i} loaded")
-
-feature_names = models[0].feature_name()
-print(f"  - {len(feature_names)} features expected")
+if LIGHTWEIGHT_SERVING:
+    print(f"Lightweight serving: blocked imports of {', '.join(block_optional_imports())}")
+
+load_start = time.perf_counter()
+if os.path.exists(MODEL_BUNDLE_PATH):
+    print(f"Loading model bundle {MODEL_BUNDLE_PATH}...")
+    bundle = ModelBundle(MODEL_BUNDLE_PATH)
+    feature_names = bundle.feature_names
+    feature_defaults = bundle.feature_defaults
+    models = bundle.models
+    print(f"  - {len(models)} fold models loaded (bundle format v{bundle.header['format_version']})")
+else:
+    import joblib
+
+    print("Loading models...")
+    models = []
+    for i in range(1, 6):
+        path = os.path.join(MODEL_DIR, f"lgb_fold{i}.pkl")
+        models.append(joblib.load(path))
+        print(f"  - Fold {i} loaded")
 
-with open(DEFAULTS_PATH) as f:
-    feature_defaults = json.load(f)
+    feature_names = models[0].feature_name()
+
+    with open(DEFAULTS_PATH) as f:
+        feature_defaults = json.load(f)
+print(f"  - {len(feature_names)} features expected")
 print(f"  - Defaults loaded for {len(feature_defaults)} features")
+print(f"  - Load time {time.perf_counter() - load_start:.2f}s, RSS {rss_mb():.0f} MB")
+
+feature_plan = FeaturePlan(feature_names, feature_defaults)
+
+flat_ensemble = None
+if INFERENCE_ENGINE in ("flat", "specialized"):
+    try:
+        from tree_engine import FlatEnsemble
+        # Kernels are compiled per process by the warm-up: running the parallel one starts
+        # numba's threading layer, which must not exist yet when serve.py forks workers
+        flat_ensemble = FlatEnsemble.from_boosters(models)
+        print(f"  - Flat engine ready: {flat_ensemble.n_trees} trees, {flat_ensemble.n_nodes} nodes")
+        if INFERENCE_ENGINE == "specialized":
+            full = flat_ensemble
+            flat_ensemble = full.specialize(feature_plan.fixed, feature_plan.base[feature_plan.fixed])
+            print(f"  - Specialized on {len(feature_plan.fixed)} fixed features: "
+                  f"{full.n_nodes - flat_ensemble.n_nodes}/{full.n_nodes} nodes eliminated, "
+                  f"{flat_ensemble.n_constant_trees - full.n_constant_trees}/{full.n_trees} trees "
+                  f"folded to constants")
+    except (ImportError, NotImplementedError) as e:
+        print(f"  - Flat engine unavailable ({e}), using LightGBM boosters")
+
+merged_ensemble = None
+if INFERENCE_ENGINE == "merged":
+    from lightgbm.basic import LightGBMError
+    from merge_folds import MergedEnsemble
+    from tree_dump import models_fingerprint
+    try:
+        if os.path.exists(MERGED_MODEL_PATH):
+            merged_ensemble = MergedEnsemble.load(MERGED_MODEL_PATH)
+            if merged_ensemble.fingerprint != models_fingerprint(models):
+                print(f"  - {MERGED_MODEL_PATH} was not merged from the loaded fold models, merging in memory")
+                merged_ensemble = None
+        if merged_ensemble is None:
+            merged_ensemble = MergedEnsemble.from_boosters(models)
+        print(f"  - Merged ensemble ready: {merged_ensemble.booster.num_trees()} trees")
+    except (OSError, ValueError, KeyError, NotImplementedError, LightGBMError) as e:
+        print(f"  - Merged engine unavailable ({e}), using LightGBM boosters")
+
+onnx_ensemble = None
+if INFERENCE_ENGINE == "onnx":
+    try:
+        from onnx_export import OnnxEnsemble, export_onnx
+        onnx_model = ONNX_MODEL_PATH if os.path.exists(ONNX_MODEL_PATH) else export_onnx(models, feature_plan)
+        onnx_ensemble = OnnxEnsemble(onnx_model, intra_op_threads=ONNX_INTRA_OP_THREADS)
+        print(f"  - ONNX engine ready ({ONNX_INTRA_OP_THREADS} intra-op threads)")
+    except (ImportError, NotImplementedError) as e:
+        print(f"  - ONNX engine unavailable ({e}), using LightGBM boosters")
+
+compiled_ensemble = None
+if INFERENCE_ENGINE == "compiled":
+    from compile_trees import CompiledEnsemble, compile_library, library_fingerprint
+    from tree_dump import models_fingerprint
+    try:
+        # Checked before loading: a library cannot be swapped once the process has mapped it
+        stale = (os.path.exists(COMPILED_MODEL_PATH)
+                 and library_fingerprint(COMPILED_MODEL_PATH) != models_fingerprint(models))
+        if stale:
+            print(f"  - {COMPILED_MODEL_PATH} was not compiled from the loaded fold models, recompiling")
+        if stale or not os.path.exists(COMPILED_MODEL_PATH):
+            compile_library(models, COMPILED_MODEL_PATH)
+        compiled_ensemble = CompiledEnsemble(COMPILED_MODEL_PATH, dtype=COMPILED_INPUT_DTYPE)
+        print(f"  - Compiled engine ready ({COMPILED_INPUT_DTYPE} inputs)")
+    except (OSError, subprocess.CalledProcessError, NotImplementedError) as e:
+        print(f"  - Compiled engine unavailable ({e}), using LightGBM boosters")
+
+prediction_cache = None
+if PREDICTION_CACHE_SIZE > 0:
+    prediction_cache = ThresholdCache(models, feature_plan.dynamic, maxsize=PREDICTION_CACHE_SIZE)
+    print(f"  - Prediction cache: {len(prediction_cache.columns)} key features, "
+          f"{PREDICTION_CACHE_SIZE} entries")
+
+# Cache keys must see the values the engine compares with the split thresholds: the
+# compiled engine with float32 inputs scores rounded rows, which can cross a threshold
+cache_key_dtype = compiled_ensemble.dtype if compiled_ensemble is not None else np.dtype(np.float64)
+
+
+def cache_key_row(x: np.ndarray) -> np.ndarray:
+    """Feature row as the scoring engine sees it, widened back to float64 for the key."""
+    if cache_key_dtype == np.float64:
+        return x
+    return x.astype(cache_key_dtype).astype(np.float64)
+
+
+def predict_fold_logs(X: np.ndarray, n_folds=None) -> np.ndarray:
+    """(N, 286) feature matrix → (folds, N) log-income predictions.
+
+    ``n_folds`` limits scoring to the first n fold boosters (degraded mode).
+    """
+    if n_folds is not None:
+        with stage_metrics.timed("predict_degraded"):
+            return np.vstack([m.predict(X, num_iteration=m.best_iteration, **lgbm_predict_params)
+                              for m in models[:n_folds]])
+    if flat_ensemble is not None:
+        with stage_metrics.timed("predict_ensemble"):
+            return flat_ensemble.predict_log(X)
+    if compiled_ensemble is not None:
+        with stage_metrics.timed("predict_compiled"):
+            return compiled_ensemble.predict_log(X)
+
+    def predict_fold(i):
+        model = models[i]
+        with stage_metrics.timed(f"predict_fold{i + 1}"):
+            return model.predict(X, num_iteration=model.best_iteration, **lgbm_predict_params)
+
+    if fold_executor is not None:
+        return np.vstack(list(fold_executor.map(predict_fold, range(len(models)))))
+    return np.vstack([predict_fold(i) for i in range(len(models))])
+
+
+def predict_mean_log(X: np.ndarray) -> np.ndarray:
+    """(N, 286) feature matrix → (N,) mean fold log prediction (merged Booster for small N)."""
+    if merged_ensemble is not None and X.shape[0] <= MERGED_MAX_ROWS:
+        with stage_metrics.timed("predict_merged"):
+            return merged_ensemble.predict_mean_log(X, **lgbm_predict_params)
+    return predict_fold_logs(X).mean(axis=0)
+
+
+def predict_fold_logs_adaptive(X: np.ndarray, tol: float) -> np.ndarray:
+    """(1, 286) feature row → log predictions of the folds evaluated before early exit.
+
+    Folds run in order; after at least two, scoring stops once the standard
+    error of their mean is below ``tol``.
+    """
+    preds = []
+    for i, model in enumerate(models, 1):
+        with stage_metrics.timed(f"predict_fold{i}"):
+            preds.append(model.predict(X, num_iteration=model.best_iteration, **lgbm_predict_params)[0])
+        k = len(preds)
+        if k >= 2 and np.std(preds, ddof=1) / np.sqrt(k) < tol:
+            break
+    return np.array(preds)
+
+
+adaptive_folds = (ADAPTIVE_FOLD_TOLERANCE > 0 and flat_ensemble is None and onnx_ensemble is None
+                  and compiled_ensemble is None)
+if ADAPTIVE_FOLD_TOLERANCE > 0 and not adaptive_folds:
+    print(f"  - Adaptive fold early exit ignored with INFERENCE_ENGINE={INFERENCE_ENGINE}")
+
+
+def predict_single_fold_logs(X: np.ndarray, n_folds=None) -> np.ndarray:
+    """Fold log predictions for one row: all folds, the first ``n_folds``, or adaptive."""
+    if n_folds is None and adaptive_folds:
+        return predict_fold_logs_adaptive(X, ADAPTIVE_FOLD_TOLERANCE)
+    return predict_fold_logs(X, n_folds)[:, 0]
+
 
 # ── App ─────────────────────────────────────────────────────
-app = FastAPI(title="AgriPredict AI", version="2.0")
+warmup = Warmup()
+
+
+@asynccontextmanager
+async def lifespan(app):
+    # Runs before uvicorn accepts connections; readiness reports the outcome
+    await warmup.run(warmup_steps())
+    print(f"  - Warm-up {warmup.state} in {warmup.duration:.2f}s"
+          + (f": {warmup.error}" if warmup.error else ""))
+    yield
+
+
+app = FastAPI(title="AgriPredict AI", version="2.0", lifespan=lifespan)
 
 app.add_middleware(
     CORSMiddleware,
@@ -39,6 +362,7 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+app.add_middleware(RequestTimingMiddleware, metrics=stage_metrics)
 
 
 # ── Request schema ──────────────────────────────────────────
@@ -55,189 +379,83 @@ class PredictionRequest(BaseModel):
     market_distance: float = 12.0
 
 
+class BatchPredictionRequest(BaseModel):
+    requests: List[PredictionRequest]
+    include_folds: bool = True
+
+
+class SweepAxis(BaseModel):
+    field: str
+    start: float
+    stop: float
+    points: int = 50
+
+
+class SweepRequest(BaseModel):
+    base: PredictionRequest = PredictionRequest()
+    axes: List[SweepAxis]
+
+
+class EligibilityQuery(BaseModel):
+    base: PredictionRequest = PredictionRequest()
+    field: str
+    tier: Literal["Medium", "High"] = "Medium"
+    low: Optional[float] = None  # search range; defaults to the field's ELIGIBILITY_SEARCH_RANGES entry
+    high: Optional[float] = None
+    tolerance: Optional[float] = None  # bracket width to stop at; defaults to 1e-4 of the range
+    candidates: int = 33  # values scored per round
+
+
+class Distribution(BaseModel):
+    kind: Literal["normal", "lognormal", "uniform", "triangular"] = "normal"
+    mean: Optional[float] = None  # centre / median / mode; defaults to the base request value
+    std: Optional[float] = None
+    low: Optional[float] = None
+    high: Optional[float] = None
+
+
+class SimulationRequest(BaseModel):
+    base: PredictionRequest = PredictionRequest()
+    distributions: Dict[str, Distribution]
+    samples: int = 5000
+    quantiles: List[float] = [0.05, 0.1, 0.25, 0.5, 0.75, 0.9, 0.95]
+    seed: Optional[int] = None
+
+
 # ── Feature mapping ────────────────────────────────────────
-def build_feature_vector(req: PredictionRequest) -> pd.DataFrame:
-    """Map 10 user inputs → 286-feature vector using training medians as defaults."""
+def build_feature_vector(req: PredictionRequest) -> np.ndarray:
+    """Map 10 user inputs → (1, 286) feature row using training medians as defaults."""
+    return feature_plan.build(request_columns([req]))
 
-    # Start from median defaults
-    row = {feat: feature_defaults.get(feat, 0.0) for feat in feature_names}
 
-    # ── Dynamic Prosperity Scaling ──
-    # Adjust defaults based on the "richness" of the input profile.
-    
-    # factors: bigger land, higher yield, higher price, more irrigation = wealthier
-    f_land = min(req.land_size / 5.0, 3.0)       # 5 acres = neutral
-    f_yield = min(req.yield_per_acre / 20.0, 2.0)
-    f_irrig = 0.5 + (req.irrigated_percentage / 100.0)
-    f_price = min(req.market_price / 2500.0, 2.0)
-    
-    prosperity_score = f_land * f_yield * f_irrig * f_price
-    
-    # Scale specific wealth-related features
-    wealth_features = [
-        "Non_Agriculture_Income",
-        "Avg_Disbursement_Amount_Bureau",
-        "No_of_Active_Loan_In_Bureau",
-        "Households_with_improved_Sanitation_Facility",
-        "perc_of_pop_living_in_hh_electricity",
-        "perc_Households_with_Pucca_House_That_Has_More_Than_3_Rooms",
-        "Perc_of_house_with_6plus_room",
-        "mat_roof_Metal_GI_Asbestos_sheets",
-        "perc_of_Wall_material_with_Burnt_brick",
-        "Infrastructure_Score",
-        "Market_Access_Score",
-        "State_Avg_Non_Agriculture_Income",
-        "State_Avg_Total_Land_For_Agriculture",
-        "K021_Seasonal_Average_Rainfall_mm", # sometimes rain implies better region
-    ]
-    
-    for feat in wealth_features:
-        if feat in row:
-            # Stronger scaling: square the prosperity score to punish low values more
-            # e.g. 0.3 becomes 0.09
-            multiplier = getattr(req, "land_size", 5) / 5.0 if feat == "State_Avg_Total_Land_For_Agriculture" else prosperity_score
-            multiplier = max(0.05, min(multiplier, 3.0)) # Floor at 5% instead of 30%
-            
-            if req.land_size < 2.0:
-                 multiplier *= 0.1 # CRUSH wealth for very small farmers
-
-            row[feat] = row[feat] * multiplier
-
-    # Specific overrides
-    if req.land_size < 2.0:
-        row["KCC_Access"] = 0
-        row["No_of_Active_Loan_In_Bureau"] = 0
-        row["Avg_Disbursement_Amount_Bureau"] = 0
-        row["Non_Agriculture_Income"] = 0
-        row["State_Avg_Non_Agriculture_Income"] *= 0.1
-    
-    # --- Direct mappings ---
-    row["Total_Land_For_Agriculture"] = req.land_size
-    row["Non_Agriculture_Income"] = row["Non_Agriculture_Income"]
-    row["K022_Proximity_to_nearest_mandi_Km"] = req.market_distance
-    row["K022_Net_Agri_area_in_Ha"] = req.land_size * 0.4047
-
-    # ... (Temperature/Rainfall mappings same as before) ...
-    for prefix in ["K021", "K022", "R020", "R021", "R022"]:
-         if f"{prefix}_Ambient_temperature_min_max__max" in row:
-             row[f"{prefix}_Ambient_temperature_min_max__max"] = req.temperature + 5
-         if f"{prefix}_Ambient_temperature_min_max__min" in row:
-             row[f"{prefix}_Ambient_temperature_min_max__min"] = req.temperature - 5
-         if f"{prefix}_Ambient_temperature_min_max__range" in row:
-             row[f"{prefix}_Ambient_temperature_min_max__range"] = 10
- 
-    # Rainfall (map to all seasonal rainfall features)
-    for prefix in ["K021", "K022", "R020", "R021", "R022"]:
-         key = f"{prefix}_Seasonal_Average_Rainfall_mm"
-         if key in row:
-             row[key] = req.rainfall
-
-    # Irrigation (Kharif + Rabi irrigated area features)
-    irr_fraction = req.irrigated_percentage / 100.0
-    irr_area = req.land_size * 0.4047 * irr_fraction
-    for col in feature_names:
-        if "Irrigated_area" in col:
-            row[col] = irr_area
-
-    # Agricultural scores (higher irrigation = better score)
-    agri_score = 50 + irr_fraction * 30 + min(req.yield_per_acre, 30) / 30 * 20
-    for col in feature_names:
-        if "Agricultural_Score" in col:
-            row[col] = agri_score
-        elif "Agricultural_performance" in col:
-            row[col] = min(agri_score / 20, 5)  # 1-5 scale
-
-    # Cropping density (higher yield = denser cropping)
-    crop_density = min(req.yield_per_acre / 20, 2.0)
-    for col in feature_names:
-        if "Cropping_density" in col:
-            row[col] = crop_density
-
-    # Engineered features
-    row["Land_sq"] = req.land_size ** 2
-    row["NonAgriIncome_sq"] = row["Non_Agriculture_Income"] ** 2  # Sync!
-    row["Land_per_Person"] = req.land_size / 4
-    row["Income_x_Land"] = row["Non_Agriculture_Income"] * req.land_size # Approximation
-    row["Loan_to_Income_Ratio"] = (row["Avg_Disbursement_Amount_Bureau"] / (row["Non_Agriculture_Income"] + 1)) if row["Avg_Disbursement_Amount_Bureau"] > 0 else 0
-    # Temperature (map to all seasonal temp features)
-    for prefix in ["K021", "K022", "R020", "R021", "R022"]:
-        if f"{prefix}_Ambient_temperature_min_max__max" in row:
-            row[f"{prefix}_Ambient_temperature_min_max__max"] = req.temperature + 5
-        if f"{prefix}_Ambient_temperature_min_max__min" in row:
-            row[f"{prefix}_Ambient_temperature_min_max__min"] = req.temperature - 5
-        if f"{prefix}_Ambient_temperature_min_max__range" in row:
-            row[f"{prefix}_Ambient_temperature_min_max__range"] = 10
-
-    # Rainfall (map to all seasonal rainfall features)
-    for prefix in ["K021", "K022", "R020", "R021", "R022"]:
-        key = f"{prefix}_Seasonal_Average_Rainfall_mm"
-        if key in row:
-            row[key] = req.rainfall
-
-    # Irrigation (Kharif + Rabi irrigated area features)
-    irr_fraction = req.irrigated_percentage / 100.0
-    irr_area = req.land_size * 0.4047 * irr_fraction
-    for col in feature_names:
-        if "Irrigated_area" in col:
-            row[col] = irr_area
-
-    # Agricultural scores (higher irrigation = better score)
-    agri_score = 50 + irr_fraction * 30 + min(req.yield_per_acre, 30) / 30 * 20
-    for col in feature_names:
-        if "Agricultural_Score" in col:
-            row[col] = agri_score
-        elif "Agricultural_performance" in col:
-            row[col] = min(agri_score / 20, 5)  # 1-5 scale
-
-    # Cropping density (higher yield = denser cropping)
-    crop_density = min(req.yield_per_acre / 20, 2.0)
-    for col in feature_names:
-        if "Cropping_density" in col:
-            row[col] = crop_density
-
-    # Sex — use median (0 or 1)
-    # Marital status — use median
-
-    # Engineered features
-    row["Land_sq"] = req.land_size ** 2
-    row["NonAgriIncome_sq"] = 0
-    row["Land_per_Person"] = req.land_size / 4  # assume 4-person household
-    row["Income_x_Land"] = 0  # can't compute without target
-    row["Loan_to_Income_Ratio"] = 0
-
-    # Rainfall aggregates
-    row["Rainfall_Mean"] = req.rainfall
-    row["Rainfall_Trend"] = 0
-    row["Rainfall_Variability"] = req.rainfall * 0.1
-
-    # Agri trend (Kharif vs Rabi)
-    row["Agri_Trend_Kharif"] = 0
-    row["Agri_Trend_Rabi"] = 0
-    row["Avg_Agri_Score"] = agri_score
-
-    # Infrastructure & market scores
-    row["Infrastructure_Score"] = 50 + irr_fraction * 30
-    row["Market_Access_Score"] = max(0, 100 - req.market_distance * 2)
-    row["KCC_Access"] = 1 if req.land_size > 2 else 0
-
-    # Socio-economic (use reasonable defaults)
-    row["Land_x_SocioScore"] = req.land_size * 50
-    row["SocioScore_x_MandiDist"] = 50 * req.market_distance
-
-    # Land holding index
-    if "Land_Holding_Index_source_Total_Agri_Area_no_of_people" in row:
-        row["Land_Holding_Index_source_Total_Agri_Area_no_of_people"] = req.land_size / 4
-
-    # Build DataFrame
-    df = pd.DataFrame([row], columns=feature_names)
-    df = df.apply(pd.to_numeric, errors="coerce").fillna(0)
-    return df
+def build_feature_matrix(cols: dict) -> np.ndarray:
+    """Vectorized build_feature_vector: N requests (as request_columns) → (N, 286) matrix."""
+    return feature_plan.build(cols)
 
 
 # ── Endpoints ───────────────────────────────────────────────
 @app.get("/api/health")
 def health():
-    return {"status": "ok", "models_loaded": len(models), "features": len(feature_names)}
+    return {"status": "ok", "ready": warmup.ready, "models_loaded": len(models), "features": len(feature_names)}
+
+
+@app.get("/api/health/live")
+def liveness():
+    return {"status": "ok"}
+
+
+@app.get("/api/health/ready")
+def readiness():
+    """200 once the startup warm-up has completed, 503 before (or if it failed)."""
+    return JSONResponse({"ready": warmup.ready, "warmup": warmup.stats()},
+                        status_code=200 if warmup.ready else 503)
+
+
+@app.get("/api/cache/stats")
+def cache_stats():
+    if prediction_cache is None:
+        return {"enabled": False}
+    return {"enabled": True, **prediction_cache.stats()}
 
 
 # ── Post-processing Heuristic ──────────────────────────────
@@ -263,44 +481,659 @@ def post_process_income(raw_income, req: PredictionRequest):
     return max(processed, 15000)
 
 
-@app.post("/api/predict")
-def predict(req: PredictionRequest):
-    print(f"Received prediction request: {req}")
+def post_process_income_batch(raw_income: np.ndarray, cols: dict) -> np.ndarray:
+    """Array version of post_process_income over request_columns inputs."""
+    dist = cols["market_distance"]
+    prosperity = prosperity_score(cols)
 
-    # Build feature vector
-    X = build_feature_vector(req)
+    processed = np.asarray(raw_income, dtype=np.float64)
 
-    # Predict with all 5 fold models (log scale)
-    preds_log = []
-    for model in models:
-        pred = model.predict(X, num_iteration=model.best_iteration)[0]
-        preds_log.append(pred)
+    # 1. Remote-farm penalty
+    penalty = np.minimum(dist / 100.0, 0.4)
+    processed = np.where(dist > 20, np.trunc(processed * (1.0 - penalty)), processed)
 
-    # Process individual folds for UI consistency
-    processed_folds = [post_process_income(int(np.expm1(p)), req) for p in preds_log]
-    
-    # Final aggregated prediction (average of logs is more stable)
-    avg_log = np.mean(preds_log)
-    raw_avg_income = int(np.expm1(avg_log))
-    predicted_income = post_process_income(raw_avg_income, req)
+    # 2. Poor-profile dampening
+    processed = np.where(prosperity < 0.4, np.trunc(processed * (0.5 + prosperity)), processed)
+
+    return np.maximum(processed, 15000).astype(np.int64)
+
+
+def loan_eligibility_tiers(income: np.ndarray) -> np.ndarray:
+    """Map predicted incomes to High / Medium / Low loan eligibility."""
+    return np.where(income >= LOAN_TIER_THRESHOLDS["High"], "High",
+                    np.where(income >= LOAN_TIER_THRESHOLDS["Medium"], "Medium", "Low"))
+
+
+def predict(req: PredictionRequest, n_folds=None, include_folds=True):
+    """Score one request; ``n_folds`` scores on only the first n folds (degraded).
+
+    A prediction cache hit is served as is, even when degraded scoring was asked
+    for: it is the full answer and cheaper; ``degraded`` is then False.
+
+    With ADAPTIVE_FOLD_TOLERANCE set, folds may stop early; ``folds_used`` says how many ran.
+    Without ``include_folds`` the response has no fold_predictions, which lets the merged
+    engine score the ensemble mean in one call.
+    """
+    request_log.log("prediction_request", **req.model_dump())
+
+    # Build feature vector (the ONNX graph assembles its own; the cache key still needs it)
+    use_onnx = onnx_ensemble is not None and n_folds is None
+    if not use_onnx or prediction_cache is not None:
+        with stage_metrics.timed("build_features"):
+            X = build_feature_vector(req)
+
+    # Predict with all 5 fold models (log scale); exact cache on threshold intervals.
+    # Entries hold the fold logs, or only the ensemble mean (a float) when the merged
+    # engine scored it; a mean-only entry cannot answer a request that wants the folds.
+    preds_log = avg_log = None
+    degraded = False
+    if prediction_cache is not None:
+        with stage_metrics.timed("cache_lookup"):
+            key = prediction_cache.key(cache_key_row(X[0]))
+            cached = prediction_cache.get(key, accept=lambda v: not include_folds or not isinstance(v, float))
+        if isinstance(cached, float):
+            avg_log = cached
+        else:
+            preds_log = cached
+    if preds_log is None and avg_log is None:
+        if not include_folds and n_folds is None and merged_ensemble is not None:
+            avg_log = float(predict_mean_log(X)[0])
+            if prediction_cache is not None:
+                prediction_cache.put(key, avg_log)
+        elif use_onnx:
+            with stage_metrics.timed("predict_onnx"):
+                preds_log = onnx_ensemble.predict_fold_logs(request_columns([req]))[:, 0]
+            if prediction_cache is not None:
+                prediction_cache.put(key, preds_log)
+        else:
+            preds_log = predict_single_fold_logs(X, n_folds)
+            degraded = n_folds is not None
+            # Early-exit results are cached too: rows sharing a key get identical fold
+            # predictions, so adaptive scoring would stop at the same fold for all of them
+            if prediction_cache is not None and not degraded:
+                prediction_cache.put(key, preds_log)
+
+    with stage_metrics.timed("post_process"):
+        # Process individual folds for UI consistency
+        if preds_log is not None:
+            if include_folds:
+                processed_folds = [post_process_income(int(np.expm1(p)), req) for p in preds_log]
+
+            # Final aggregated prediction (average of logs is more stable)
+            avg_log = np.mean(preds_log)
+        raw_avg_income = int(np.expm1(avg_log))
+        predicted_income = post_process_income(raw_avg_income, req)
 
     # Loan eligibility
-    if predicted_income >= 800000:
+    if predicted_income >= LOAN_TIER_THRESHOLDS["High"]:
         loan_eligibility = "High"
-    elif predicted_income >= 350000:
+    elif predicted_income >= LOAN_TIER_THRESHOLDS["Medium"]:
         loan_eligibility = "Medium"
     else:
         loan_eligibility = "Low"
 
-    return {
+    result = {
         "predicted_income": predicted_income,
         "loan_eligibility": loan_eligibility,
         "model_version": "v2.0-lightgbm",
         "features_used": len(feature_names),
-        "fold_predictions": processed_folds,
+        "folds_used": len(preds_log) if preds_log is not None else len(models),
+        "degraded": degraded,
+    }
+    if include_folds:
+        result["fold_predictions"] = processed_folds
+    return result
+
+
+def score_columns(cols: dict, include_folds=True):
+    """Vectorized predict() over request_columns inputs.
+
+    Returns (predicted_income, loan_eligibility, processed fold incomes (folds, N)),
+    the fold incomes being None without ``include_folds``.
+    """
+    processed_folds = None
+    if onnx_ensemble is not None:
+        # Feature assembly runs inside the graph
+        with stage_metrics.timed("predict_onnx"):
+            preds_log = onnx_ensemble.predict_fold_logs(cols)
+        avg_log = preds_log.mean(axis=0)
+    else:
+        # One (N, 286) matrix for the whole batch
+        with stage_metrics.timed("build_features"):
+            X = build_feature_matrix(cols)
+
+        if include_folds:
+            # One predict call per fold model → (folds, N) log predictions
+            preds_log = predict_fold_logs(X)
+            avg_log = preds_log.mean(axis=0)
+        else:
+            avg_log = predict_mean_log(X)
+
+    with stage_metrics.timed("post_process"):
+        if include_folds:
+            processed_folds = np.vstack([
+                post_process_income_batch(np.trunc(np.expm1(p)), cols) for p in preds_log
+            ])
+        predicted_income = post_process_income_batch(np.trunc(np.expm1(avg_log)), cols)
+        eligibility = loan_eligibility_tiers(predicted_income)
+    return predicted_income, eligibility, processed_folds
+
+
+def score_requests(reqs: List[PredictionRequest], include_folds=True) -> list:
+    """Score many requests in one vectorized pass; one predict()-shaped dict per request."""
+    predicted_income, eligibility, processed_folds = score_columns(request_columns(reqs), include_folds)
+    results = []
+    for i in range(len(reqs)):
+        result = {
+            "predicted_income": int(predicted_income[i]),
+            "loan_eligibility": str(eligibility[i]),
+            "model_version": "v2.0-lightgbm",
+            "features_used": len(feature_names),
+            "folds_used": len(models),
+            "degraded": False,
+        }
+        if include_folds:
+            result["fold_predictions"] = processed_folds[:, i].tolist()
+        results.append(result)
+    return results
+
+
+# ── Request timing helpers ─────────────────────────────────
+def mark_validated():
+    """Record time from request arrival to handler entry (body read + pydantic validation)."""
+    started = request_started.get()
+    if started is not None:
+        stage_metrics.observe("validation", time.perf_counter() - started)
+
+
+def respond(result) -> JSONResponse:
+    with stage_metrics.timed("serialization"):
+        return JSONResponse(result)
+
+
+# ── Single-flight ───────────────────────────────────────────
+single_flight = SingleFlight() if SINGLE_FLIGHT else None
+
+
+def request_key(req: PredictionRequest) -> tuple:
+    """Canonical identity of a request: its field values in schema order."""
+    return tuple(req.model_dump().values())
+
+
+async def deduplicated(key, fn):
+    """``await fn()``, shared with identical requests (same ``key``) already in flight."""
+    if single_flight is None:
+        return await fn()
+    return await single_flight.run(key, fn)
+
+
+# ── Micro-batching ──────────────────────────────────────────
+# Concurrent /api/predict calls are coalesced and scored through score_requests
+micro_batcher = None
+if MICRO_BATCHING:
+    micro_batcher = MicroBatcher(score_requests, max_batch_size=MICRO_BATCH_MAX_SIZE,
+                                 max_wait_ms=MICRO_BATCH_WAIT_MS, executor=inference_executor,
+                                 max_concurrency=INFERENCE_WORKERS)
+
+
+# ── Admission control ───────────────────────────────────────
+admission = None
+if ADMISSION_SLO_MS > 0:
+    # Requests served at once: one per worker, or up to max_batch_size in each batch
+    # the micro-batcher can score concurrently
+    parallel = (micro_batcher.max_concurrency * micro_batcher.max_batch_size if micro_batcher is not None
+                else INFERENCE_WORKERS)
+    admission = AdmissionController(ADMISSION_SLO_MS, parallel, degrade=ADMISSION_MODE == "degrade",
+                                    degraded_cost=min(DEGRADED_FOLDS, len(models)) / len(models))
+
+
+def predict_measured(req: PredictionRequest, n_folds=None, include_folds=True):
+    """predict() that also feeds its service time (excluding queueing) to admission control."""
+    start = time.perf_counter()
+    result = predict(req, n_folds, include_folds)
+    if admission is not None:
+        admission.record(time.perf_counter() - start, degraded=result["degraded"])
+    return result
+
+
+async def score_single(req: PredictionRequest, n_folds=None, include_folds=True):
+    """One /api/predict computation, micro-batched when enabled (full ensemble only)."""
+    if n_folds is None and micro_batcher is not None:
+        result = await micro_batcher.submit(req)
+        if not include_folds:
+            result = {k: v for k, v in result.items() if k != "fold_predictions"}
+        return result
+    return await run_inference(predict_measured, req, n_folds, include_folds)
+
+
+async def admitted(req: PredictionRequest, include_folds=True):
+    """score_single() under admission control: may degrade, or raise a 503 when overloaded."""
+    if admission is None:
+        return await score_single(req, include_folds=include_folds)
+    try:
+        with admission.admit() as degraded:
+            if degraded:
+                return await score_single(req, DEGRADED_FOLDS, include_folds)
+            if micro_batcher is None:
+                return await score_single(req, include_folds=include_folds)
+            # Micro-batch queueing is bounded by MICRO_BATCH_WAIT_MS; count it as service time
+            start = time.perf_counter()
+            result = await score_single(req, include_folds=include_folds)
+            admission.record(time.perf_counter() - start)
+            return result
+    except Overloaded as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": str(e.retry_after)})
+
+
+@app.post("/api/predict")
+async def predict_endpoint(req: PredictionRequest, include_folds: bool = True):
+    mark_validated()
+    return respond(await deduplicated((request_key(req), include_folds), lambda: admitted(req, include_folds)))
+
+
+@app.post("/api/predict/batch")
+async def predict_batch(batch: BatchPredictionRequest):
+    mark_validated()
+    n = len(batch.requests)
+    if n == 0:
+        return {"count": 0, "predictions": []}
+    if n > MAX_BATCH_SIZE:
+        raise HTTPException(status_code=413, detail=f"Batch size {n} exceeds limit of {MAX_BATCH_SIZE}")
+    return respond({"count": n, "predictions": await run_inference(score_requests, batch.requests,
+                                                                    batch.include_folds)})
+
+
+def sweep_curve(sweep: SweepRequest) -> dict:
+    """Income over the grid of the swept fields, all other inputs fixed at ``base``."""
+    grids = np.meshgrid(*[np.linspace(a.start, a.stop, a.points) for a in sweep.axes], indexing="ij")
+    n = grids[0].size
+    cols = {f: np.full(n, float(getattr(sweep.base, f))) for f in INPUT_FIELDS}
+    for axis, grid in zip(sweep.axes, grids):
+        cols[axis.field] = grid.ravel()
+
+    predicted_income, eligibility, _ = score_columns(cols, include_folds=False)
+    return {
+        "shape": [a.points for a in sweep.axes],
+        "axes": [{"field": a.field, "values": np.linspace(a.start, a.stop, a.points).tolist()}
+                 for a in sweep.axes],
+        "predicted_income": predicted_income.tolist(),
+        "loan_eligibility": eligibility.tolist(),
     }
 
 
+@app.post("/api/predict/sweep")
+async def predict_sweep(sweep: SweepRequest):
+    mark_validated()
+    if not sweep.axes:
+        raise HTTPException(status_code=422, detail="At least one sweep axis is required")
+    for axis in sweep.axes:
+        if axis.field not in INPUT_FIELDS:
+            raise HTTPException(status_code=422,
+                                detail=f"Cannot sweep '{axis.field}'; choose from {INPUT_FIELDS}")
+        if axis.points < 1:
+            raise HTTPException(status_code=422, detail="Each sweep axis needs at least one point")
+        if axis.points > MAX_BATCH_SIZE:
+            raise HTTPException(status_code=413, detail=f"Sweep axis '{axis.field}' has {axis.points} points, "
+                                                        f"limit is {MAX_BATCH_SIZE}")
+    if len({a.field for a in sweep.axes}) != len(sweep.axes):
+        raise HTTPException(status_code=422, detail="Each field can be swept only once")
+    # Exact integer product (np.prod wraps around on int64 overflow)
+    n = math.prod(a.points for a in sweep.axes)
+    if n > MAX_BATCH_SIZE:
+        raise HTTPException(status_code=413, detail=f"Sweep grid of {n} points exceeds limit of {MAX_BATCH_SIZE}")
+    return respond(await run_inference(sweep_curve, sweep))
+
+
+# Default input range searched by /api/predict/minimum, per field
+ELIGIBILITY_SEARCH_RANGES = {
+    "land_size": (0.0, 100.0),
+    "irrigated_percentage": (0.0, 100.0),
+    "yield_per_acre": (0.0, 100.0),
+    "rainfall": (0.0, 5000.0),
+    "temperature": (-10.0, 50.0),
+    "market_price": (0.0, 20000.0),
+    "market_distance": (0.0, 200.0),
+}
+# Bracket-narrowing rounds after the initial scan (each shrinks it ~candidates-fold)
+MAX_SEARCH_ROUNDS = 20
+
+
+def minimum_value(query: EligibilityQuery) -> dict:
+    """Smallest ``field`` value (others fixed at ``base``) whose income reaches the tier threshold.
+
+    Each round scores ``candidates`` evenly spaced values as one batch: the first
+    scan covers [low, high], then every round re-scans the bracket between the
+    last value below the threshold and the first one at or above it. Income need
+    not be monotone in the field; the answer is the first crossing the scan finds.
+    """
+    threshold = LOAN_TIER_THRESHOLDS[query.tier]
+    default_low, default_high = ELIGIBILITY_SEARCH_RANGES[query.field]
+    low = default_low if query.low is None else query.low
+    high = default_high if query.high is None else query.high
+    tolerance = query.tolerance if query.tolerance is not None else (high - low) * 1e-4
+    cols = {f: np.full(query.candidates, float(getattr(query.base, f))) for f in INPUT_FIELDS}
+
+    def scan(lo, hi):
+        values = np.linspace(lo, hi, query.candidates)
+        cols[query.field] = values
+        income, _, _ = score_columns(cols, include_folds=False)
+        return values, income
+
+    values, income = scan(low, high)
+    rounds, evaluations = 1, len(values)
+    reached = np.flatnonzero(income >= threshold)
+    result = {"field": query.field, "tier": query.tier, "threshold": threshold,
+              "base_value": float(getattr(query.base, query.field)), "range": [low, high]}
+    if len(reached) == 0:
+        return {**result, "reachable": False, "value": None, "best_predicted_income": int(income.max()),
+                "rounds": rounds, "evaluations": evaluations}
+
+    i = reached[0]
+    best, best_income = values[i], income[i]
+    while i > 0 and values[i] - values[i - 1] > tolerance and rounds <= MAX_SEARCH_ROUNDS:
+        values, income = scan(values[i - 1], values[i])
+        rounds, evaluations = rounds + 1, evaluations + len(values)
+        # The bracket's upper end reached the threshold last round, so a crossing exists
+        i = np.flatnonzero(income >= threshold)[0]
+        best, best_income = values[i], income[i]
+    return {**result, "reachable": True, "value": float(best), "predicted_income": int(best_income),
+            "bracket": [float(values[max(i - 1, 0)]), float(best)], "rounds": rounds, "evaluations": evaluations}
+
+
+@app.post("/api/predict/minimum")
+async def predict_minimum(query: EligibilityQuery):
+    mark_validated()
+    if query.field not in INPUT_FIELDS:
+        raise HTTPException(status_code=422, detail=f"Cannot search '{query.field}'; choose from {INPUT_FIELDS}")
+    low, high = ELIGIBILITY_SEARCH_RANGES[query.field]
+    if (query.low if query.low is not None else low) >= (query.high if query.high is not None else high):
+        raise HTTPException(status_code=422, detail="The search range needs low < high")
+    if query.tolerance is not None and query.tolerance <= 0:
+        raise HTTPException(status_code=422, detail="Tolerance must be positive")
+    if not 3 <= query.candidates <= MAX_BATCH_SIZE:
+        raise HTTPException(status_code=422, detail=f"Candidates per round must be in [3, {MAX_BATCH_SIZE}]")
+    return respond(await run_inference(minimum_value, query))
+
+
+def simulate(sim: SimulationRequest) -> dict:
+    """Income distribution when the chosen inputs vary; every sample scored in one pass."""
+    seed = sim.seed if sim.seed is not None else int(np.random.SeedSequence().entropy % 2**32)
+    rng = np.random.default_rng(seed)
+    cols = {f: np.full(sim.samples, float(getattr(sim.base, f))) for f in INPUT_FIELDS}
+    for field, dist in sim.distributions.items():
+        cols[field] = draw(rng, sim.samples, field, base=float(getattr(sim.base, field)), **dist.model_dump())
+
+    predicted_income, eligibility, _ = score_columns(cols, include_folds=False)
+    tiers, counts = np.unique(eligibility, return_counts=True)
+    probability = dict.fromkeys(("High", "Medium", "Low"), 0.0)
+    probability.update({str(t): c / sim.samples for t, c in zip(tiers, counts)})
+    return {
+        "samples": sim.samples,
+        "seed": seed,
+        "predicted_income": {
+            "mean": float(predicted_income.mean()),
+            "std": float(predicted_income.std()),
+            "quantiles": {str(q): float(v) for q, v in
+                          zip(sim.quantiles, np.quantile(predicted_income, sim.quantiles))},
+        },
+        "loan_eligibility": probability,
+    }
+
+
+@app.post("/api/predict/simulate")
+async def predict_simulate(sim: SimulationRequest):
+    mark_validated()
+    if not sim.distributions:
+        raise HTTPException(status_code=422, detail=f"Give a distribution for at least one of "
+                                                    f"{list(SIMULATION_FIELDS)}")
+    try:
+        for field, dist in sim.distributions.items():
+            check_distribution(field, **dist.model_dump())
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    if not all(0.0 <= q <= 1.0 for q in sim.quantiles):
+        raise HTTPException(status_code=422, detail="Quantiles must lie in [0, 1]")
+    if sim.samples < 1:
+        raise HTTPException(status_code=422, detail="At least one sample is required")
+    if sim.samples > MAX_SIMULATION_SAMPLES:
+        raise HTTPException(status_code=413, detail=f"{sim.samples} samples exceed limit of "
+                                                    f"{MAX_SIMULATION_SAMPLES}")
+    return respond(await run_inference(simulate, sim))
+
+
+@app.post("/api/predict/upload")
+async def predict_upload(request: Request, format: str = "ndjson", id_column: Optional[str] = None):
+    """Score a CSV of farmer profiles (raw text/csv body or multipart file upload).
+
+    One output record per data row, streamed back chunk by chunk as NDJSON or CSV
+    while the upload is still being read. Columns named after PredictionRequest
+    fields are used, others are ignored; ``id_column`` is echoed back as ``id``.
+    """
+    if format not in ("ndjson", "csv"):
+        raise HTTPException(status_code=422, detail="format must be 'ndjson' or 'csv'")
+
+    async def score_chunk(cols):
+        return await run_inference(score_columns, cols)
+
+    return CsvScoringResponse(request.headers.get("content-type"), score_chunk, INPUT_FIELDS,
+                              PredictionRequest().model_dump(), output=format,
+                              chunk_rows=min(CSV_CHUNK_ROWS, MAX_BATCH_SIZE), id_column=id_column)
+
+
+# ── Explanations ────────────────────────────────────────────
+explainer = FoldExplainer(models, feature_plan, lgbm_predict_params)
+# Contributions depend on a row only through its split decisions: key like the prediction cache
+explain_cache = None
+if EXPLAIN_CACHE_SIZE > 0:
+    explain_cache = ThresholdCache(models, feature_plan.dynamic, maxsize=EXPLAIN_CACHE_SIZE)
+
+
+def explain_rows(rows) -> list:
+    """Feature rows queued by concurrent /api/explain calls → one contribution vector each."""
+    with stage_metrics.timed("explain"):
+        return list(explainer.contributions(np.vstack(rows)))
+
+
+explain_batcher = MicroBatcher(explain_rows, max_batch_size=EXPLAIN_BATCH_MAX_SIZE,
+                               max_wait_ms=EXPLAIN_BATCH_WAIT_MS, executor=inference_executor,
+                               max_concurrency=INFERENCE_WORKERS)
+
+
+async def explain_contributions(x: np.ndarray) -> np.ndarray:
+    """Fold-averaged contributions for one feature row, from the cache or a shared batch."""
+    if explain_cache is None:
+        return await explain_batcher.submit(x)
+    key = explain_cache.key(x)
+    contrib = explain_cache.get(key)
+    if contrib is None:
+        contrib = await deduplicated(("explain", key), lambda: explain_batcher.submit(x))
+        explain_cache.put(key, contrib)
+    return contrib
+
+
+@app.post("/api/explain")
+async def explain_endpoint(req: PredictionRequest):
+    """Why this income: per-feature contributions to the mean fold log prediction.
+
+    Contributions are in log-income units and, with ``expected_log_income``, add
+    up to ``log_prediction``; request-independent defaults form one bucket.
+    """
+    mark_validated()
+    with stage_metrics.timed("build_features"):
+        x = build_feature_vector(req)[0]
+    result = explainer.summarize(x, await explain_contributions(x))
+    result["predicted_income"] = post_process_income(int(np.expm1(result["log_prediction"])), req)
+    return respond(result)
+
+
+@app.get("/api/explain/stats")
+def explain_stats():
+    return {"cache": {"enabled": False} if explain_cache is None else {"enabled": True, **explain_cache.stats()},
+            "batching": explain_batcher.stats()}
+
+
+# ── Interactive WebSocket channel ───────────────────────────
+session_stats = SessionStats()
+
+
+def validate_state(state: dict):
+    """Session state → (cache key, PredictionRequest); pydantic errors are ValueErrors."""
+    req = PredictionRequest(**state)
+    return request_key(req), req
+
+
+async def score_state(req: PredictionRequest) -> dict:
+    """Same path as /api/predict (single-flight, admission, micro-batching), minus HTTP."""
+    return await deduplicated((request_key(req), True), lambda: admitted(req))
+
+
+@app.websocket("/api/ws/predict")
+async def predict_socket(websocket: WebSocket):
+    """Interactive predictions over one connection.
+
+    The client sends JSON objects holding any subset of the PredictionRequest
+    fields (``{}`` scores the current state); each is merged into the session
+    state, starting from the defaults. The server pushes
+    ``{"type": "prediction", "version": n, "inputs": {...}, ...predict() fields}``
+    for the latest state once a burst of deltas settles, or ``{"type": "error", ...}``.
+    """
+    await websocket.accept()
+    session = PredictionSession(PredictionRequest().model_dump(), validate_state, score_state,
+                                websocket.send_json, session_stats, debounce_ms=WS_DEBOUNCE_MS,
+                                max_delay_ms=WS_MAX_DELAY_MS, cache_size=WS_SESSION_CACHE_SIZE)
+    session_stats.add(open=1, sessions=1)
+    scorer = asyncio.create_task(session.run())
+
+    async def reject(detail):
+        session_stats.add(messages=1, errors=1)
+        await websocket.send_json({"type": "error", "detail": detail})
+
+    try:
+        while True:
+            try:
+                delta = await websocket.receive_json()
+            except (ValueError, KeyError):
+                # KeyError: a binary frame (it has no text to parse)
+                await reject("Messages must be JSON objects")
+                continue
+            unknown = set(delta) - set(PredictionRequest.model_fields) if isinstance(delta, dict) else None
+            if unknown is None or unknown:
+                await reject(f"Unknown fields {sorted(unknown)}" if unknown else "Messages must be JSON objects")
+                continue
+            try:
+                # Reject bad values before they reach the session state
+                PredictionRequest(**delta)
+            except ValueError as e:
+                await reject(str(e))
+                continue
+            session.update(delta)
+    except WebSocketDisconnect:
+        pass
+    finally:
+        # Before awaiting: the handler itself may be cancelled (server shutdown)
+        session_stats.add(open=-1)
+        scorer.cancel()
+        await asyncio.gather(scorer, return_exceptions=True)
+
+
+@app.get("/api/ws/stats")
+def websocket_stats():
+    return session_stats.stats()
+
+
+# ── Warm-up ─────────────────────────────────────────────────
+def warmup_steps() -> list:
+    """Flat-engine compilation, then synthetic single and batched requests through the
+    same scoring path as live traffic.
+
+    Single requests bypass admission control: a slow cold call must neither get
+    later warm-up steps shed nor enter the admission service-time average.
+    """
+    n = max([WARMUP_REQUESTS, *WARMUP_BATCH_SIZES], default=0)
+    reqs = [PredictionRequest(**r)
+            for r in synthetic_requests(PredictionRequest().model_dump(), INPUT_FIELDS, n)]
+
+    async def single(req):
+        if micro_batcher is not None:
+            return respond(await micro_batcher.submit(req))
+        return respond(await run_inference(predict, req))
+
+    async def batch(reqs):
+        return respond({"count": len(reqs), "predictions": await run_inference(score_requests, reqs)})
+
+    steps = [("compile", partial(run_inference, flat_ensemble.compile))] if flat_ensemble is not None else []
+    steps += [("single", partial(single, r)) for r in reqs[:WARMUP_REQUESTS]]
+    steps += [(f"batch_{size}", partial(batch, reqs[:size])) for size in WARMUP_BATCH_SIZES]
+    return steps
+
+
+@app.get("/api/dedup/stats")
+def dedup_stats():
+    if single_flight is None:
+        return {"enabled": False}
+    return {"enabled": True, **single_flight.stats()}
+
+
+@app.get("/api/admission/stats")
+def admission_stats():
+    if admission is None:
+        return {"enabled": False}
+    return {"enabled": True, **admission.stats()}
+
+
+@app.get("/api/batching/stats")
+def batching_stats():
+    if micro_batcher is None:
+        return {"enabled": False}
+    return {"enabled": True, **micro_batcher.stats()}
+
+
+@app.get("/api/metrics")
+def metrics():
+    """Prometheus text exposition of stage latencies, cache, dedup, admission, batching, explain and
+    WebSocket counters."""
+    parts = [stage_metrics.render()]
+    if prediction_cache is not None:
+        cache = prediction_cache.stats()
+        parts.append(render_values("agripredict_cache_events_total", "Prediction cache lookups by outcome.",
+                                   "counter", [({"outcome": k}, cache[k]) for k in ("hits", "misses", "evictions")]))
+        parts.append(render_values("agripredict_cache_entries", "Entries in the prediction cache.",
+                                   "gauge", [({}, cache["size"])]))
+    if single_flight is not None:
+        dedup = single_flight.stats()
+        parts.append(render_values("agripredict_singleflight_calls_total",
+                                   "/api/predict calls by single-flight outcome.", "counter",
+                                   [({"outcome": "executed"}, dedup["executions"]),
+                                    ({"outcome": "deduplicated"}, dedup["deduplicated"])]))
+    if admission is not None:
+        adm = admission.stats()
+        parts.append(render_values("agripredict_admission_requests_total",
+                                   "/api/predict requests by admission outcome.", "counter",
+                                   [({"outcome": k}, adm[k]) for k in ("served", "degraded", "shed")]))
+        parts.append(render_values("agripredict_admission_in_flight", "Admitted /api/predict requests in flight.",
+                                   "gauge", [({}, adm["in_flight"])]))
+    if micro_batcher is not None:
+        batching = micro_batcher.stats()
+        parts.append(render_values("agripredict_microbatch_batches_total", "Micro-batches dispatched.",
+                                   "counter", [({}, batching["batches"])]))
+        parts.append(render_values("agripredict_microbatch_items_total", "Requests scored via micro-batches.",
+                                   "counter", [({}, batching["items"])]))
+    sessions = session_stats.stats()
+    parts.append(render_values("agripredict_ws_sessions_open", "Open /api/ws/predict sessions.",
+                               "gauge", [({}, sessions["open_sessions"])]))
+    parts.append(render_values("agripredict_ws_messages_total", "/api/ws/predict input deltas by outcome.",
+                               "counter", [({"outcome": k}, sessions[k])
+                                           for k in ("scored", "cache_hits", "coalesced", "errors")]))
+    explaining = explain_batcher.stats()
+    parts.append(render_values("agripredict_explain_batches_total", "pred_contrib batches run for /api/explain.",
+                               "counter", [({}, explaining["batches"])]))
+    if explain_cache is not None:
+        cache = explain_cache.stats()
+        parts.append(render_values("agripredict_explain_cache_events_total", "Explanation cache lookups by outcome.",
+                                   "counter", [({"outcome": k}, cache[k]) for k in ("hits", "misses", "evictions")]))
+    return PlainTextResponse("".join(parts), media_type="text/plain; version=0.0.4")
+
+
 # ── Run ─────────────────────────────────────────────────────
 if __name__ == "__main__":
     import uvicorn
@@ -0,0 +1,166 @@
+"""Merge the fold boosters into one LightGBM model whose output is the ensemble mean.
+
+Each fold's trees (up to its ``best_iteration``) are concatenated with leaf
+values scaled by 1/folds, so a single ``predict`` returns the mean log
+prediction that main.py otherwise gets from five calls. Fold ``k`` occupies a
+contiguous range of iterations, so its own output is still available as
+``folds * predict(start_iteration=..., num_iteration=...)``.
+
+Build from the fold pickles, check equivalence and time it (run from backend/):
+    python merge_folds.py [output path]
+"""
+import json
+import os
+import sys
+import time
+
+import numpy as np
+
+from tree_dump import models_fingerprint
+
+# Per-tree lines holding output values, scaled by 1/folds
+_SCALED_KEYS = ("leaf_value", "internal_value")
+# Header lines that must agree across folds
+_SHARED_KEYS = ("num_class", "num_tree_per_iteration", "max_feature_idx", "objective", "feature_names")
+
+
+def _split_model(text):
+    """LightGBM model text → (header lines, tree blocks, trailer after the trees)."""
+    head, rest = text.split("\nTree=", 1)
+    trees_text, trailer = rest.split("\nend of trees", 1)
+    trees = ["Tree=" + t.strip("\n") for t in trees_text.split("\nTree=")]
+    return head.split("\n"), trees, trailer
+
+
+def _scale_tree(block, index, weight):
+    lines = []
+    for line in block.split("\n"):
+        key, _, value = line.partition("=")
+        if key == "Tree":
+            line = f"Tree={index}"
+        elif key == "is_linear" and value.strip() != "0":
+            raise NotImplementedError("Linear trees cannot be merged")
+        elif key in _SCALED_KEYS:
+            line = key + "=" + " ".join(format(float(v) * weight, ".17g") for v in value.split())
+        lines.append(line)
+    return "\n".join(lines)
+
+
+def merge_model_strings(texts) -> tuple:
+    """Fold model texts → (merged model text, [(start_iteration, num_iterations)] per fold)."""
+    weight = 1.0 / len(texts)
+    header, shared, trailer = None, None, None
+    trees, slices = [], []
+    for text in texts:
+        head, fold_trees, tail = _split_model(text)
+        fields = dict(line.split("=", 1) for line in head if "=" in line)
+        if fields.get("num_tree_per_iteration") != "1" or "average_output" in head:
+            raise NotImplementedError("Only single-output boosted (non-averaged) models can be merged")
+        keys = {k: fields.get(k) for k in _SHARED_KEYS}
+        if shared is None:
+            header, shared = head, keys
+            # Per-fold feature importances no longer apply; keep parameters and the rest
+            trailer = tail[tail.find("\nparameters:"):] if "\nparameters:" in tail else tail
+        elif keys != shared:
+            raise ValueError("Fold models disagree on " + ", ".join(k for k in keys if keys[k] != shared[k]))
+        slices.append((len(trees), len(fold_trees)))
+        trees.extend(_scale_tree(t, len(trees) + i, weight) for i, t in enumerate(fold_trees))
+
+    # tree_sizes holds per-tree byte offsets of the original model; without it LightGBM parses sequentially
+    header = [line for line in header if not line.startswith("tree_sizes=")]
+    text = "\n".join(header).rstrip("\n") + "\n\n" + "\n\n".join(trees) + "\n\n\nend of trees" + trailer
+    return text, slices
+
+
+class MergedEnsemble:
+    """One merged Booster plus the iteration range of every fold inside it.
+
+    ``fingerprint`` identifies the fold models it was merged from (None for a
+    file saved without one).
+    """
+
+    def __init__(self, booster, slices, fingerprint=None):
+        self.booster = booster
+        self.slices = slices
+        self.n_folds = len(slices)
+        self.fingerprint = fingerprint
+
+    @classmethod
+    def from_boosters(cls, models) -> "MergedEnsemble":
+        import lightgbm as lgb
+        text, slices = merge_model_strings(
+            [m.model_to_string(num_iteration=m.best_iteration) for m in models])
+        return cls(lgb.Booster(model_str=text), slices, models_fingerprint(models))
+
+    @classmethod
+    def load(cls, path) -> "MergedEnsemble":
+        """Read a model written by ``save``; fold slices and fingerprint live in a JSON sidecar."""
+        import lightgbm as lgb
+        with open(path + ".json") as f:
+            meta = json.load(f)
+        slices = [tuple(s) for s in meta["fold_slices"]]
+        return cls(lgb.Booster(model_file=path), slices, meta.get("source_fingerprint"))
+
+    def save(self, path):
+        self.booster.save_model(path)
+        with open(path + ".json", "w") as f:
+            json.dump({"fold_slices": self.slices, "source_fingerprint": self.fingerprint}, f)
+
+    def predict_mean_log(self, X, **params) -> np.ndarray:
+        """(N, features) → (N,) mean fold log prediction, in one call."""
+        return self.booster.predict(X, num_iteration=-1, **params)
+
+    def predict_fold_logs(self, X, **params) -> np.ndarray:
+        """(N, features) → (folds, N) per-fold log predictions (one call per fold)."""
+        return np.vstack([self.n_folds * self.booster.predict(X, start_iteration=start, num_iteration=n, **params)
+                          for start, n in self.slices])
+
+
+def _best_time(fn, repeats):
+    best = float("inf")
+    for _ in range(3):
+        start = time.perf_counter()
+        for _ in range(repeats):
+            fn()
+        best = min(best, (time.perf_counter() - start) / repeats)
+    return best
+
+
+if __name__ == "__main__":
+    import joblib
+
+    model_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), "models")
+    out_path = sys.argv[1] if len(sys.argv) > 1 else os.path.join(model_dir, "lgb_merged.txt")
+
+    models = [joblib.load(os.path.join(model_dir, f"lgb_fold{i}.pkl")) for i in range(1, 6)]
+    merged = MergedEnsemble.from_boosters(models)
+    merged.save(out_path)
+    merged = MergedEnsemble.load(out_path)
+    print(f"Saved merged model with {merged.booster.num_trees()} trees from {merged.n_folds} folds to {out_path}")
+
+    # Rows around the training medians, as the serving feature plan produces them
+    with open(os.path.join(model_dir, "feature_defaults.json")) as f:
+        defaults = json.load(f)
+    base = np.array([defaults.get(n, 0.0) for n in models[0].feature_name()])
+    X = base * np.random.default_rng(0).uniform(0.5, 1.5, (10000, len(base)))
+    X[0] = base
+
+    def averaged(rows):
+        return np.mean([m.predict(rows, num_iteration=m.best_iteration) for m in models], axis=0)
+
+    reference = averaged(X)
+    diff = np.abs(merged.predict_mean_log(X) - reference)
+    fold_diff = np.abs(merged.predict_fold_logs(X) -
+                       np.vstack([m.predict(X, num_iteration=m.best_iteration) for m in models]))
+    income_diff = np.abs(np.trunc(np.expm1(merged.predict_mean_log(X))) - np.trunc(np.expm1(reference)))
+    print(f"Equivalence on {len(X)} rows: max |Δ mean log| {diff.max():.2e}, "
+          f"max |Δ fold log| {fold_diff.max():.2e}, max |Δ income| {income_diff.max():.0f}")
+    if diff.max() > 1e-9:
+        sys.exit("Merged model does not match the averaged fold predictions")
+
+    print(f"\n{'Input':<14} {'5 boosters ms':>14} {'merged ms':>10} {'speedup':>8}")
+    print("-" * 49)
+    for name, rows, repeats in (("single row", X[:1], 500), ("batch 10000", X, 3)):
+        t_folds = _best_time(lambda: averaged(rows), repeats)
+        t_merged = _best_time(lambda: merged.predict_mean_log(rows), repeats)
+        print(f"{name:<14} {t_folds * 1e3:>14.3f} {t_merged * 1e3:>10.3f} {t_folds / t_merged:>7.2f}x")
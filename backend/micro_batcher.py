@@ -0,0 +1,133 @@
+"""Asyncio request coalescer: score concurrent single predictions as one matrix."""
+import asyncio
+import threading
+import time
+from collections import Counter, deque
+
+import numpy as np
+
+
+class MicroBatcher:
+    """Queue single items and hand them to ``score_batch`` in groups.
+
+    The worker takes the first queued item, drains whatever else is already
+    waiting and, under load (the previous batch held more than one item),
+    keeps collecting for up to ``max_wait_ms`` or until ``max_batch_size``.
+    An isolated request is therefore dispatched at once, while a burst is
+    coalesced. ``score_batch(items)`` runs on ``executor`` (the loop's default
+    executor if None) and must return one result per item.
+
+    Up to ``max_concurrency`` batches are scored at once (match it to the
+    executor's worker count). The next batch is only collected once a slot is
+    free, so while all slots are busy requests keep queueing into a larger batch.
+    """
+
+    def __init__(self, score_batch, max_batch_size=64, max_wait_ms=2.0, executor=None, max_concurrency=1):
+        self.score_batch = score_batch
+        self.executor = executor
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000.0
+        self.max_concurrency = max_concurrency
+        self._loop = None
+        self._queue = None
+        self._slots = None
+        self._worker = None
+        self._dispatched = set()
+        self._last_size = 0
+
+        self._lock = threading.Lock()
+        self.batch_sizes = Counter()
+        self.items = 0
+        self.delay_total = 0.0
+        self.delay_max = 0.0
+        self._recent_delays = deque(maxlen=2048)
+
+    async def submit(self, item):
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop or self._worker is None or self._worker.done():
+            self._loop = loop
+            self._queue = asyncio.Queue()
+            self._slots = asyncio.Semaphore(self.max_concurrency)
+            self._worker = loop.create_task(self._run())
+        future = loop.create_future()
+        self._queue.put_nowait((item, future, time.perf_counter()))
+        return await future
+
+    async def _collect(self):
+        batch = [await self._queue.get()]
+        while len(batch) < self.max_batch_size and not self._queue.empty():
+            batch.append(self._queue.get_nowait())
+        if self._last_size > 1 and self.max_wait > 0:
+            deadline = batch[0][2] + self.max_wait
+            while len(batch) < self.max_batch_size:
+                timeout = deadline - time.perf_counter()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+        return batch
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            await self._slots.acquire()
+            try:
+                batch = await self._collect()
+            except BaseException:
+                self._slots.release()
+                raise
+            self._last_size = len(batch)
+            self._record(batch, time.perf_counter())
+            task = loop.create_task(self._dispatch(batch))
+            # Keep a reference until done (the loop only holds weak ones)
+            self._dispatched.add(task)
+            task.add_done_callback(self._dispatched.discard)
+
+    async def _dispatch(self, batch):
+        """Score one batch on the executor and resolve its futures; frees its slot."""
+        try:
+            items = [item for item, _, _ in batch]
+            try:
+                results = await asyncio.get_running_loop().run_in_executor(self.executor, self.score_batch, items)
+            except Exception as e:
+                for _, future, _ in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                return
+            for (_, future, _), result in zip(batch, results):
+                if not future.done():
+                    future.set_result(result)
+        finally:
+            self._slots.release()
+
+    def _record(self, batch, dispatched_at):
+        with self._lock:
+            self.batch_sizes[len(batch)] += 1
+            for _, _, queued_at in batch:
+                delay = dispatched_at - queued_at
+                self.items += 1
+                self.delay_total += delay
+                self.delay_max = max(self.delay_max, delay)
+                self._recent_delays.append(delay)
+
+    def stats(self) -> dict:
+        with self._lock:
+            batches = sum(self.batch_sizes.values())
+            recent = np.array(self._recent_delays) * 1000.0
+            return {
+                "max_batch_size": self.max_batch_size,
+                "max_concurrency": self.max_concurrency,
+                "max_wait_ms": self.max_wait * 1000.0,
+                "batches": batches,
+                "items": self.items,
+                "mean_batch_size": self.items / batches if batches else 0.0,
+                "batch_size_distribution": dict(sorted(self.batch_sizes.items())),
+                "queue_delay_ms": {
+                    "mean": self.delay_total / self.items * 1000.0 if self.items else 0.0,
+                    "max": self.delay_max * 1000.0,
+                    "p50": float(np.percentile(recent, 50)) if len(recent) else 0.0,
+                    "p99": float(np.percentile(recent, 99)) if len(recent) else 0.0,
+                },
+            }
@@ -0,0 +1,166 @@
+"""Single-file, versioned model bundle: fold models + feature schema + defaults.
+
+Layout (little-endian)::
+
+    8 bytes   magic  b"AGRIBNDL"
+    4 bytes   uint32 format version
+    8 bytes   uint64 header length
+    N bytes   JSON header (feature names, section table, metadata)
+    ...       sections, each aligned to 64 bytes
+
+Sections are a float64 default vector (read zero-copy from the memory map)
+and one LightGBM model text per fold, trimmed to its ``best_iteration``.
+Fold models are only parsed the first time ``models`` is accessed.
+
+Build from the fold pickles (run from backend/):  python model_bundle.py
+"""
+import json
+import mmap
+import os
+import struct
+import sys
+import time
+
+import numpy as np
+
+MAGIC = b"AGRIBNDL"
+FORMAT_VERSION = 1
+ALIGN = 64
+_PREAMBLE = struct.Struct("<8sIQ")
+
+
+def _pad(n):
+    return (-n) % ALIGN
+
+
+def write_bundle(path, models, feature_defaults, model_version="v2.0-lightgbm"):
+    """Write fold Boosters and the default vector (in model feature order) to ``path``."""
+    feature_names = models[0].feature_name()
+    defaults = np.array([feature_defaults.get(f, 0.0) for f in feature_names], dtype="<f8")
+    payloads = [("defaults", "float64", defaults.tobytes())]
+    for i, booster in enumerate(models, 1):
+        text = booster.model_to_string(num_iteration=booster.best_iteration)
+        payloads.append((f"fold{i}", "lightgbm_text", text.encode("utf-8")))
+
+    meta = {
+        "format_version": FORMAT_VERSION,
+        "model_version": model_version,
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "feature_names": feature_names,
+        "n_models": len(models),
+        "best_iterations": [int(b.best_iteration) for b in models],
+    }
+
+    # Section offsets depend on the header length, so size the header first
+    def header_bytes(sections):
+        return json.dumps({**meta, "sections": sections}).encode("utf-8")
+
+    sections = [{"name": n, "kind": k, "offset": 0, "length": len(p)} for n, k, p in payloads]
+    header = header_bytes(sections)
+    while True:
+        offset = _PREAMBLE.size + len(header)
+        offset += _pad(offset)
+        for sec in sections:
+            sec["offset"] = offset
+            offset += sec["length"] + _pad(sec["length"])
+        resized = header_bytes(sections)
+        done = len(resized) == len(header)
+        header = resized
+        if done:
+            break
+
+    with open(path, "wb") as f:
+        f.write(_PREAMBLE.pack(MAGIC, FORMAT_VERSION, len(header)))
+        f.write(header)
+        for sec, (_, _, payload) in zip(sections, payloads):
+            f.write(b"\0" * (sec["offset"] - f.tell()))
+            f.write(payload)
+    return path
+
+
+class ModelBundle:
+    """Memory-mapped view of a bundle file; fold models are parsed lazily."""
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, "rb") as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, header_len = _PREAMBLE.unpack_from(self._mm, 0)
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not a model bundle")
+        if version != FORMAT_VERSION:
+            raise ValueError(f"Unsupported bundle format version {version} (expected {FORMAT_VERSION})")
+        self.header = json.loads(self._mm[_PREAMBLE.size:_PREAMBLE.size + header_len])
+        self.sections = {s["name"]: s for s in self.header["sections"]}
+        self.feature_names = self.header["feature_names"]
+        self.model_version = self.header["model_version"]
+        self._models = None
+
+    @property
+    def defaults(self) -> np.ndarray:
+        """Default vector in feature order, backed directly by the memory map."""
+        sec = self.sections["defaults"]
+        return np.frombuffer(self._mm, dtype="<f8", count=sec["length"] // 8, offset=sec["offset"])
+
+    @property
+    def feature_defaults(self) -> dict:
+        return dict(zip(self.feature_names, self.defaults.tolist()))
+
+    @property
+    def models(self) -> list:
+        if self._models is None:
+            import lightgbm as lgb
+            self._models = []
+            for i in range(1, self.header["n_models"] + 1):
+                sec = self.sections[f"fold{i}"]
+                text = self._mm[sec["offset"]:sec["offset"] + sec["length"]].decode("utf-8")
+                self._models.append(lgb.Booster(model_str=text))
+        return self._models
+
+
+# Modules LightGBM imports only to accept DataFrame/Arrow inputs or for its sklearn
+# wrapper and plotting helpers; inference here always passes NumPy arrays.
+OPTIONAL_LIGHTGBM_IMPORTS = ("pandas", "sklearn", "matplotlib", "graphviz", "datatable", "dask", "pyarrow")
+
+
+def block_optional_imports(names=OPTIONAL_LIGHTGBM_IMPORTS) -> list:
+    """Make later ``import`` of ``names`` fail fast so LightGBM skips them.
+
+    Must run before lightgbm is first imported; modules already loaded are left
+    alone. Returns the names that were blocked.
+    """
+    blocked = []
+    for name in names:
+        if name not in sys.modules:
+            sys.modules[name] = None  # import raises ModuleNotFoundError
+            blocked.append(name)
+    return blocked
+
+
+def rss_mb() -> float:
+    """Current resident set size of this process in MB."""
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024.0
+    except OSError:
+        pass
+    import resource
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024.0
+
+
+if __name__ == "__main__":
+    import joblib
+
+    model_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), "models")
+    out_path = sys.argv[1] if len(sys.argv) > 1 else os.path.join(model_dir, "model_bundle.agb")
+
+    models = [joblib.load(os.path.join(model_dir, f"lgb_fold{i}.pkl")) for i in range(1, 6)]
+    with open(os.path.join(model_dir, "feature_defaults.json")) as f:
+        feature_defaults = json.load(f)
+
+    write_bundle(out_path, models, feature_defaults)
+    bundle = ModelBundle(out_path)
+    print(f"Saved bundle v{FORMAT_VERSION} with {len(bundle.sections) - 1} fold models "
+          f"({os.path.getsize(out_path) / 1e6:.1f} MB) to {out_path}")
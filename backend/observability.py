@@ -0,0 +1,157 @@
+"""Low-overhead stage latency histograms, Prometheus rendering and sampled request logs."""
+import json
+import logging
+import os
+import queue
+import random
+import sys
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from contextvars import ContextVar
+from logging.handlers import QueueHandler, QueueListener
+
+# Seconds; covers sub-100µs feature assembly up to multi-second bulk batches
+DEFAULT_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025,
+                   0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+# perf_counter() when the current HTTP request entered the app
+request_started = ContextVar("request_started", default=None)
+
+
+class Histogram:
+    """Fixed-bucket latency histogram (cumulative only when rendered)."""
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+        self._lock = threading.Lock()
+
+    def observe(self, seconds):
+        i = bisect_left(self.buckets, seconds)
+        with self._lock:
+            self.counts[i] += 1
+            self.sum += seconds
+            self.count += 1
+
+    def snapshot(self):
+        with self._lock:
+            return list(self.counts), self.sum, self.count
+
+
+class StageMetrics:
+    """One histogram per named stage, created on first use."""
+
+    def __init__(self, name="agripredict_stage_latency_seconds",
+                 help_text="Latency of each request-processing stage."):
+        self.name = name
+        self.help_text = help_text
+        self._stages = {}
+        self._lock = threading.Lock()
+
+    def histogram(self, stage) -> Histogram:
+        hist = self._stages.get(stage)
+        if hist is None:
+            with self._lock:
+                hist = self._stages.setdefault(stage, Histogram())
+        return hist
+
+    def observe(self, stage, seconds):
+        self.histogram(stage).observe(seconds)
+
+    @contextmanager
+    def timed(self, stage):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(stage, time.perf_counter() - start)
+
+    def render(self) -> str:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        for stage in sorted(self._stages):
+            counts, total, count = self._stages[stage].snapshot()
+            buckets = self._stages[stage].buckets
+            cumulative = 0
+            for le, c in zip(buckets, counts):
+                cumulative += c
+                lines.append(f'{self.name}_bucket{{stage="{stage}",le="{le}"}} {cumulative}')
+            lines.append(f'{self.name}_bucket{{stage="{stage}",le="+Inf"}} {count}')
+            lines.append(f'{self.name}_sum{{stage="{stage}"}} {total}')
+            lines.append(f'{self.name}_count{{stage="{stage}"}} {count}')
+        return "\n".join(lines) + "\n"
+
+
+def render_values(name, help_text, kind, samples) -> str:
+    """Prometheus text for a counter/gauge family; samples are (labels dict, value)."""
+    lines = [f"# HELP {name} {help_text}", f"# TYPE {name} {kind}"]
+    for labels, value in samples:
+        label_str = ",".join(f'{k}="{v}"' for k, v in labels.items())
+        lines.append(f"{name}{{{label_str}}} {value}" if label_str else f"{name} {value}")
+    return "\n".join(lines) + "\n"
+
+
+class RequestTimingMiddleware:
+    """Pure ASGI middleware: stamps request_started and times the whole request."""
+
+    def __init__(self, app, metrics: StageMetrics):
+        self.app = app
+        self.metrics = metrics
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        start = time.perf_counter()
+        request_started.set(start)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.metrics.observe("request_total", time.perf_counter() - start)
+
+
+# ── Sampled, asynchronous structured logging ───────────────
+class _RecordQueueHandler(QueueHandler):
+    """Enqueue the raw record; formatting happens on the listener thread."""
+
+    def prepare(self, record):
+        return record
+
+
+class _JsonFormatter(logging.Formatter):
+    def format(self, record):
+        payload = {"ts": round(record.created, 6), "level": record.levelname}
+        payload.update(record.msg if isinstance(record.msg, dict) else {"message": record.getMessage()})
+        return json.dumps(payload, default=str)
+
+
+class SampledLogger:
+    """Emit roughly ``sample_rate`` of events as JSON lines, off the request thread."""
+
+    def __init__(self, name, sample_rate=0.01, stream=None):
+        self.sample_rate = sample_rate
+        self.logger = logging.getLogger(name)
+        self.logger.setLevel(logging.INFO)
+        self.logger.propagate = False
+        self._out = logging.StreamHandler(stream or sys.stdout)
+        self._out.setFormatter(_JsonFormatter())
+        self._start_listener()
+        # The listener thread does not survive fork (serve.py workers); start a fresh one
+        if hasattr(os, "register_at_fork"):
+            os.register_at_fork(after_in_child=self._start_listener)
+
+    def _start_listener(self):
+        self._queue = queue.SimpleQueue()
+        self.logger.handlers = [_RecordQueueHandler(self._queue)]
+        self._listener = QueueListener(self._queue, self._out)
+        self._listener.start()
+
+    def log(self, event, **fields):
+        if self.sample_rate <= 0 or random.random() >= self.sample_rate:
+            return
+        self.logger.info({"event": event, **fields})
+
+    def stop(self):
+        self._listener.stop()
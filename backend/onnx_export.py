@@ -0,0 +1,273 @@
+"""Export feature assembly + fold ensemble to one ONNX graph, and run it with onnxruntime.
+
+The graph takes the raw numeric request inputs as an (N, 7) float64 tensor in
+``INPUT_FIELDS`` order and returns ``fold_logs``, the (N, folds) log predictions.
+A second output, ``features``, exposes the assembled (N, 286) matrix for
+parity checks. Feature assembly mirrors ``FeaturePlan.build`` operation by
+operation (element-wise ops and column Gathers only, no MatMul), so the
+features are bit-identical. The folds are one ``ai.onnx.ml`` TreeEnsemble
+(opset 5, double precision) with one target per fold.
+
+Optional: requires ``onnx`` to export and ``onnxruntime`` to serve.
+
+Export from the fold pickles (run from backend/):  python onnx_export.py [output path]
+"""
+import numpy as np
+
+from feature_plan import INPUT_FIELDS
+from tree_dump import check_identity_objective
+
+IR_VERSION = 10
+OPSETS = {"": 21, "ai.onnx.ml": 5}
+
+
+class _GraphBuilder:
+    """Tiny helper that names nodes and constants as they are added."""
+
+    def __init__(self):
+        from onnx import helper, numpy_helper
+        self.helper = helper
+        self.numpy_helper = numpy_helper
+        self.nodes = []
+        self.initializers = []
+        self._n = 0
+
+    def _name(self, prefix):
+        self._n += 1
+        return f"{prefix}_{self._n}"
+
+    def const(self, value, dtype=np.float64):
+        name = self._name("const")
+        self.initializers.append(self.numpy_helper.from_array(np.asarray(value, dtype=dtype), name))
+        return name
+
+    def op(self, op_type, *inputs, domain="", **attrs):
+        out = self._name(op_type.lower())
+        self.nodes.append(self.helper.make_node(op_type, list(inputs), [out], domain=domain, **attrs))
+        return out
+
+    # Arithmetic on tensors / python scalars (scalars become float64 constants)
+    def _arg(self, x):
+        return self.const(x) if isinstance(x, (int, float)) else x
+
+    def add(self, a, b): return self.op("Add", self._arg(a), self._arg(b))
+    def sub(self, a, b): return self.op("Sub", self._arg(a), self._arg(b))
+    def mul(self, a, b): return self.op("Mul", self._arg(a), self._arg(b))
+    def div(self, a, b): return self.op("Div", self._arg(a), self._arg(b))
+    def min(self, a, b): return self.op("Min", self._arg(a), self._arg(b))
+    def max(self, a, b): return self.op("Max", self._arg(a), self._arg(b))
+    def clip(self, a, lo, hi): return self.op("Clip", a, self._arg(lo), self._arg(hi))
+    def where(self, cond, a, b): return self.op("Where", cond, self._arg(a), self._arg(b))
+
+
+def _assemble_features(g, inputs, plan):
+    """Nodes computing FeaturePlan.build(cols) from the (N, 7) inputs; returns the (N, 286) name."""
+    cols = {}
+    for i, field in enumerate(INPUT_FIELDS):
+        idx = g.const([i], np.int64)
+        cols[field] = g.op("Slice", inputs, idx, g.const([i + 1], np.int64), g.const([1], np.int64))
+
+    land, yld, rain = cols["land_size"], cols["yield_per_acre"], cols["rainfall"]
+    temp, dist = cols["temperature"], cols["market_distance"]
+    irr_fraction = g.div(cols["irrigated_percentage"], 100.0)
+
+    # prosperity_score(), left to right as in NumPy
+    f_land = g.min(g.div(land, 5.0), 3.0)
+    f_yield = g.min(g.div(yld, 20.0), 2.0)
+    f_irrig = g.add(0.5, irr_fraction)
+    f_price = g.min(g.div(cols["market_price"], 2500.0), 2.0)
+    prosperity = g.mul(g.mul(g.mul(f_land, f_yield), f_irrig), f_price)
+
+    small = g.op("Less", land, g.const(2.0))
+    crush = g.where(small, 0.1, 1.0)
+    mult = g.mul(g.clip(prosperity, 0.05, 3.0), crush)
+    land_mult = g.mul(g.clip(g.div(land, 5.0), 0.05, 3.0), crush)
+    one = g.op("ConstantOfShape", g.op("Shape", land),
+               value=g.numpy_helper.from_array(np.array([1.0]), "one"))
+
+    agri_score = g.add(g.add(50.0, g.mul(irr_fraction, 30.0)), g.mul(g.div(g.min(yld, 30.0), 30.0), 20.0))
+    values = {
+        "land": land,
+        "market_distance": dist,
+        "net_area": g.mul(land, 0.4047),
+        "temp_max": g.add(temp, 5.0),
+        "temp_min": g.sub(temp, 5.0),
+        "rainfall": rain,
+        "irr_area": g.mul(g.mul(land, 0.4047), irr_fraction),
+        "agri_score": agri_score,
+        "agri_perf": g.min(g.div(agri_score, 20.0), 5.0),
+        "crop_density": g.min(g.div(yld, 20.0), 2.0),
+        "land_sq": g.mul(land, land),
+        "land_quarter": g.div(land, 4.0),
+        "rain_var": g.mul(rain, 0.1),
+        "infra": g.add(50.0, g.mul(irr_fraction, 30.0)),
+        "market_access": g.max(0.0, g.sub(100.0, g.mul(dist, 2.0))),
+        "kcc": g.where(g.op("Greater", land, g.const(2.0)), 1.0, 0.0),
+        "land_x_socio": g.mul(land, 50.0),
+        "socio_x_mandi": g.mul(50.0, dist),
+    }
+    group_names = list(plan.groups)
+    written = np.unique(np.concatenate(list(plan.groups.values())))
+    scaled = np.setdiff1d(plan.dynamic, written)  # defaults build() rescales per request
+    fixed = plan.fixed
+
+    # Scaled defaults like build(): (base * wealth multiplier) * small-farm factor
+    scale_src = np.zeros(plan.n_features, dtype=np.int64)  # 0 → 1.0, 1 → mult, 2 → land_mult
+    scale_src[plan.wealth] = 1
+    scale_src[plan.land_wealth] = 2
+    small_src = np.zeros(plan.n_features, dtype=np.int64)  # 0 → 1.0, 1 → 0 if small, 2 → 0.1 if small
+    small_src[plan.small_zeroed] = 1
+    small_src[plan.small_scaled] = 2
+    scale = g.op("Gather", g.op("Concat", one, mult, land_mult, axis=1), g.const(scale_src[scaled], np.int64), axis=1)
+    small_scale = g.op("Gather", g.op("Concat", one, g.where(small, 0.0, 1.0), g.where(small, 0.1, 1.0), axis=1),
+                       g.const(small_src[scaled], np.int64), axis=1)
+    defaults = g.mul(g.mul(g.const(plan.base[None, scaled]), scale), small_scale)
+
+    # Only request-driven columns can be NaN (base is NaN-free), so sanitize them
+    # before the fixed defaults are broadcast to (N, n_features)
+    dynamic = g.op("Concat", *[values[name] for name in group_names], defaults, axis=1)
+    dynamic = g.where(g.op("IsNaN", dynamic), 0.0, dynamic)
+    fixed_shape = g.op("Mul", g.op("Shape", land), g.const([1, len(fixed)], np.int64))
+    stacked = g.op("Concat", dynamic, g.op("Expand", g.const(plan.base[None, fixed]), fixed_shape), axis=1)
+
+    # Column j comes from the last group writing it, else its (scaled or fixed) default
+    source = np.empty(plan.n_features, dtype=np.int64)
+    source[scaled] = len(group_names) + np.arange(len(scaled))
+    source[fixed] = len(group_names) + len(scaled) + np.arange(len(fixed))
+    for k, name in enumerate(group_names):
+        source[plan.groups[name]] = k
+    return g.op("Gather", stacked, g.const(source, np.int64), axis=1)
+
+
+def _tree_ensemble(g, X, models):
+    """One TreeEnsemble node summing each fold's trees into its own target."""
+    feature_ids, splits, true_ids, true_leaf, false_ids, false_leaf = [], [], [], [], [], []
+    leaf_targets, leaf_weights, roots = [], [], []
+
+    def add_leaf(value, target):
+        leaf_targets.append(target)
+        leaf_weights.append(value)
+        return len(leaf_weights) - 1
+
+    def add(node, target):
+        """Append ``node``'s split; returns its node id."""
+        if node["decision_type"] != "<=" or node["missing_type"] != "None":
+            raise NotImplementedError("Only numerical '<=' splits without missing-value handling can be exported")
+        k = len(feature_ids)
+        feature_ids.append(node["split_feature"])
+        splits.append(node["threshold"])
+        for ids, leafs in ((true_ids, true_leaf), (false_ids, false_leaf)):
+            ids.append(-1)
+            leafs.append(0)
+        for child, ids, leafs in ((node["left_child"], true_ids, true_leaf),
+                                  (node["right_child"], false_ids, false_leaf)):
+            if "split_feature" in child:
+                ids[k] = add(child, target)
+            else:
+                ids[k] = add_leaf(child["leaf_value"], target)
+                leafs[k] = 1
+        return k
+
+    for target, booster in enumerate(models):
+        dump = booster.dump_model(num_iteration=booster.best_iteration)
+        check_identity_objective(dump, "ONNX export")
+        for tree in dump["tree_info"]:
+            root = tree["tree_structure"]
+            if "split_feature" in root:
+                roots.append(add(root, target))
+            else:
+                # Single-leaf tree: a split whose branches both reach the leaf
+                leaf = add_leaf(root["leaf_value"], target)
+                roots.append(len(feature_ids))
+                feature_ids.append(0)
+                splits.append(0.0)
+                true_ids.append(leaf)
+                false_ids.append(leaf)
+                true_leaf.append(1)
+                false_leaf.append(1)
+
+    return g.op(
+        "TreeEnsemble", X, domain="ai.onnx.ml",
+        nodes_featureids=feature_ids,
+        nodes_modes=g.numpy_helper.from_array(np.zeros(len(feature_ids), dtype=np.uint8), "modes"),  # BRANCH_LEQ
+        nodes_splits=g.numpy_helper.from_array(np.array(splits, dtype=np.float64), "splits"),
+        nodes_truenodeids=true_ids, nodes_trueleafs=true_leaf,
+        nodes_falsenodeids=false_ids, nodes_falseleafs=false_leaf,
+        leaf_targetids=leaf_targets,
+        leaf_weights=g.numpy_helper.from_array(np.array(leaf_weights, dtype=np.float64), "leaf_weights"),
+        tree_roots=roots, n_targets=len(models), aggregate_function=1, post_transform=0,
+    )
+
+
+def export_onnx(models, plan):
+    """Fold Boosters + FeaturePlan → onnx.ModelProto (inputs → fold_logs, features)."""
+    import onnx
+    from onnx import TensorProto
+
+    g = _GraphBuilder()
+    X = _assemble_features(g, "inputs", plan)
+    fold_logs = _tree_ensemble(g, X, models)
+    g.nodes.append(g.helper.make_node("Identity", [X], ["features"]))
+    g.nodes.append(g.helper.make_node("Identity", [fold_logs], ["fold_logs"]))
+
+    graph = g.helper.make_graph(
+        g.nodes, "agripredict_ensemble",
+        [g.helper.make_tensor_value_info("inputs", TensorProto.DOUBLE, [None, len(INPUT_FIELDS)])],
+        [g.helper.make_tensor_value_info("fold_logs", TensorProto.DOUBLE, [None, len(models)]),
+         g.helper.make_tensor_value_info("features", TensorProto.DOUBLE, [None, plan.n_features])],
+        initializer=g.initializers,
+    )
+    model = g.helper.make_model(graph, opset_imports=[g.helper.make_opsetid(d, v) for d, v in OPSETS.items()],
+                                producer_name="agripredict")
+    model.ir_version = IR_VERSION
+    onnx.checker.check_model(model)
+    return model
+
+
+class OnnxEnsemble:
+    """onnxruntime CPU session over an exported graph."""
+
+    def __init__(self, model, intra_op_threads=1):
+        """``model`` is a path, serialized bytes or an onnx.ModelProto."""
+        import onnxruntime as ort
+        if hasattr(model, "SerializeToString"):
+            model = model.SerializeToString()
+        options = ort.SessionOptions()
+        options.intra_op_num_threads = intra_op_threads
+        options.inter_op_num_threads = 1
+        self.session = ort.InferenceSession(model, options, providers=["CPUExecutionProvider"])
+
+    @staticmethod
+    def _inputs(cols):
+        return np.ascontiguousarray(np.column_stack([cols[f] for f in INPUT_FIELDS]), dtype=np.float64)
+
+    def predict_fold_logs(self, cols: dict) -> np.ndarray:
+        """request_columns inputs → (folds, N) log predictions."""
+        return self.session.run(["fold_logs"], {"inputs": self._inputs(cols)})[0].T
+
+    def features(self, cols: dict) -> np.ndarray:
+        """request_columns inputs → (N, 286) feature matrix assembled by the graph."""
+        return self.session.run(["features"], {"inputs": self._inputs(cols)})[0]
+
+
+if __name__ == "__main__":
+    import json
+    import os
+    import sys
+
+    import joblib
+    import onnx
+
+    from feature_plan import FeaturePlan
+
+    model_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), "models")
+    out_path = sys.argv[1] if len(sys.argv) > 1 else os.path.join(model_dir, "ensemble.onnx")
+
+    models = [joblib.load(os.path.join(model_dir, f"lgb_fold{i}.pkl")) for i in range(1, 6)]
+    with open(os.path.join(model_dir, "feature_defaults.json")) as f:
+        feature_defaults = json.load(f)
+
+    model = export_onnx(models, FeaturePlan(models[0].feature_name(), feature_defaults))
+    onnx.save(model, out_path)
+    print(f"Saved ONNX graph ({len(model.graph.node)} nodes, {os.path.getsize(out_path) / 1e6:.1f} MB) "
+          f"to {out_path}; check parity with: python test_onnx_parity.py")
@@ -0,0 +1,54 @@
+"""Request corpus and reference predictions shared by the engine parity tests and benchmarks.
+
+Importing this module loads ``main`` on the LightGBM engine with the cache and
+warm-up off, so every other engine is compared against the fold Boosters.
+"""
+import json
+import os
+
+import numpy as np
+
+os.environ.update(INFERENCE_ENGINE="lightgbm", PREDICTION_CACHE_SIZE="0", WARMUP_REQUESTS="0",
+                  REQUEST_LOG_SAMPLE_RATE="0")
+
+import main  # noqa: E402
+
+CORPUS_SIZE = 2000
+CORPUS_PATH = os.environ.get("PARITY_CORPUS")
+
+# The form's input ranges
+INPUT_RANGES = {
+    "land_size": (0.1, 30.0), "irrigated_percentage": (0.0, 100.0), "yield_per_acre": (1.0, 60.0),
+    "rainfall": (50.0, 3500.0), "temperature": (0.0, 48.0), "market_price": (300.0, 9000.0),
+    "market_distance": (0.0, 90.0),
+}
+
+
+def recorded_requests(path) -> list:
+    """``prediction_request`` events of a request log (JSON lines from the sampled request logger)."""
+    with open(path) as f:
+        events = [json.loads(line) for line in f if line.strip()]
+    return [main.PredictionRequest(**{k: e[k] for k in main.PredictionRequest.model_fields if k in e})
+            for e in events if e.get("event") == "prediction_request"]
+
+
+def sampled_requests(n=CORPUS_SIZE, seed=0) -> list:
+    """Requests spread over the form's input ranges, plus the feature plan's edge cases."""
+    rng = np.random.default_rng(seed)
+    rows = [{f: float(rng.uniform(lo, hi)) for f, (lo, hi) in INPUT_RANGES.items()} for _ in range(n)]
+    # Small-farm cut-off, KCC cut-off, saturated scores and clipped multipliers
+    rows += [{"land_size": land} for land in (1.99, 2.0, 2.01, 0.0, 100.0)]
+    rows += [{"market_distance": 0.0}, {"market_distance": 50.0}, {"market_distance": 200.0},
+             {"irrigated_percentage": 0.0}, {"irrigated_percentage": 100.0},
+             {"yield_per_acre": 30.0}, {"yield_per_acre": 200.0}, {"market_price": 1e6}]
+    return [main.PredictionRequest(**row) for row in rows]
+
+
+def corpus_requests(path=CORPUS_PATH, seed=0) -> list:
+    """The recorded request log at ``path`` if given, else sampled requests."""
+    return recorded_requests(path) if path else sampled_requests(seed=seed)
+
+
+def booster_predict(X: np.ndarray) -> np.ndarray:
+    """(N, features) → (folds, N) log predictions straight from the fold Boosters."""
+    return np.vstack([m.predict(X, num_iteration=m.best_iteration) for m in main.models])
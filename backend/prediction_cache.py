@@ -0,0 +1,101 @@
+"""Exact LRU cache of fold predictions keyed by split-threshold intervals.
+
+Two feature rows that fall into the same interval between consecutive split
+thresholds on every column the ensemble splits on reach the same leaves in
+every tree, so their fold predictions are identical. Rows are canonicalized to
+those interval indices and looked up in a bounded LRU.
+"""
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+from tree_dump import K_ZERO_THRESHOLD
+
+
+def split_thresholds(models, columns) -> dict:
+    """Sorted unique split thresholds per column, over each booster's used trees."""
+    wanted = set(int(c) for c in columns)
+    found = {c: set() for c in wanted}
+
+    def walk(node):
+        if "split_feature" not in node:
+            return
+        if node["split_feature"] in wanted:
+            found[node["split_feature"]].add(node["threshold"])
+        walk(node["left_child"])
+        walk(node["right_child"])
+
+    for booster in models:
+        for tree in booster.dump_model(num_iteration=booster.best_iteration)["tree_info"]:
+            walk(tree["tree_structure"])
+    return {c: np.array(sorted(t), dtype=np.float64) for c, t in found.items() if t}
+
+
+class ThresholdCache:
+    """Bounded LRU of fold log-predictions keyed by canonical threshold intervals.
+
+    Only ``columns`` (the input-dependent features) take part in the key; all
+    other columns must be constant across rows, as they are for FeaturePlan rows.
+    """
+
+    policy = "lru"
+
+    def __init__(self, models, columns, maxsize=4096):
+        self.maxsize = maxsize
+        thresholds = split_thresholds(models, columns)
+        self.columns = np.array(sorted(thresholds), dtype=np.intp)
+        self.thresholds = [thresholds[c] for c in self.columns]
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def key(self, row: np.ndarray) -> bytes:
+        """Interval index per split column; zero-ish and NaN values get their own classes."""
+        values = row[self.columns]
+        idx = np.empty(len(self.columns), dtype=np.int32)
+        for i, (v, th) in enumerate(zip(values, self.thresholds)):
+            idx[i] = np.searchsorted(th, v, side="left")
+        # LightGBM routes |x| <= kZeroThreshold and NaN separately for Zero / NaN missing types
+        idx = idx * 2 + (np.abs(values) <= K_ZERO_THRESHOLD)
+        idx[np.isnan(values)] = -1
+        return idx.tobytes()
+
+    def get(self, key, accept=None):
+        """Cached value for ``key``, or None; an entry ``accept`` rejects counts as a miss."""
+        with self._lock:
+            value = self._entries.get(key)
+            if value is None or (accept is not None and not accept(value)):
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key, value):
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "policy": self.policy,
+                "size": len(self._entries),
+                "maxsize": self.maxsize,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "key_columns": len(self.columns),
+            }
@@ -0,0 +1,118 @@
+"""Pre-fork multi-worker server: load models once, then fork uvicorn workers.
+
+The parent imports ``main`` (fold models, defaults, feature plan), freezes the
+GC so those objects stay in shared copy-on-write pages, binds the listening
+socket and forks ``WORKERS`` children that all accept on it. Crashed workers
+are restarted; SIGTERM / SIGINT are forwarded to the workers. Each worker runs
+the startup warm-up (see main.py) before it starts accepting connections; that
+is also where the flat engines compile, so numba's threading layer (not safe
+across fork) only ever starts inside workers.
+
+Settings (environment):
+    PORT          listen port (default 5000)
+    WORKERS       worker processes (default: number of usable CPUs)
+    CPU_AFFINITY  "none" (default), "auto" (worker i → i-th usable CPU) or a
+                  comma-separated CPU list assigned round-robin, e.g. "0,2,4"
+
+Run from backend/:  WORKERS=4 CPU_AFFINITY=auto python serve.py
+"""
+import gc
+import os
+import signal
+import socket
+import sys
+import time
+
+import uvicorn
+
+
+def usable_cpus():
+    if hasattr(os, "sched_getaffinity"):
+        return sorted(os.sched_getaffinity(0))
+    return list(range(os.cpu_count() or 1))
+
+
+def cpu_plan(setting, n_workers):
+    """Per-worker CPU (or None) for the CPU_AFFINITY setting."""
+    if setting in ("", "none"):
+        return [None] * n_workers
+    cpus = usable_cpus() if setting == "auto" else [int(c) for c in setting.split(",")]
+    return [cpus[i % len(cpus)] for i in range(n_workers)]
+
+
+def run_worker(app, sock, cpu):
+    if cpu is not None and hasattr(os, "sched_setaffinity"):
+        os.sched_setaffinity(0, {cpu})
+    signal.signal(signal.SIGINT, signal.SIG_DFL)
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    config = uvicorn.Config(app, log_level="warning", access_log=False)
+    uvicorn.Server(config).run(sockets=[sock])
+
+
+def spawn(app, sock, cpu):
+    pid = os.fork()
+    if pid == 0:
+        try:
+            run_worker(app, sock, cpu)
+        finally:
+            os._exit(0)
+    return pid
+
+
+def main():
+    host = os.environ.get("HOST", "0.0.0.0")
+    port = int(os.environ.get("PORT", "5000"))
+    n_workers = int(os.environ.get("WORKERS", str(len(usable_cpus()))))
+    cpus = cpu_plan(os.environ.get("CPU_AFFINITY", "none"), n_workers)
+
+    # Load everything once in the parent; children inherit it copy-on-write
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    import main as service
+    gc.collect()
+    gc.freeze()
+
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(2048)
+    sock.set_inheritable(True)
+
+    workers = {spawn(service.app, sock, cpu): cpu for cpu in cpus}
+    print(f"Serving on {host}:{port} with {n_workers} workers "
+          f"(parent {os.getpid()}, RSS {service.rss_mb():.0f} MB)")
+    for pid, cpu in workers.items():
+        print(f"  - worker {pid}" + (f" pinned to CPU {cpu}" if cpu is not None else ""))
+
+    stopping = False
+
+    def stop(signum, frame):
+        nonlocal stopping
+        stopping = True
+        for pid in list(workers):
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+
+    # Supervise: restart workers that die unless we are shutting down
+    while workers:
+        try:
+            pid, status = os.wait()
+        except ChildProcessError:
+            break
+        except InterruptedError:
+            continue
+        cpu = workers.pop(pid, None)
+        if not stopping:
+            print(f"  - worker {pid} exited with status {status}, restarting")
+            time.sleep(0.5)
+            workers[spawn(service.app, sock, cpu)] = cpu
+
+    sock.close()
+
+
+if __name__ == "__main__":
+    main()
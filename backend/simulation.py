@@ -0,0 +1,59 @@
+"""Monte Carlo sampling of uncertain request inputs for the scenario simulation endpoint.
+
+Each uncertain field gets a distribution; every sample is one full request, so
+the whole simulation is scored as a single (samples, features) matrix.
+"""
+import numpy as np
+
+# Inputs that may be simulated, with the physical lower bound samples are clipped to
+SIMULATION_FIELDS = {
+    "rainfall": 0.0,
+    "temperature": None,
+    "market_price": 0.0,
+    "yield_per_acre": 0.0,
+}
+
+DISTRIBUTIONS = ("normal", "lognormal", "uniform", "triangular")
+
+
+def check_distribution(field, kind, mean, std, low, high):
+    """Raise ValueError when the parameters do not define a ``kind`` distribution for ``field``."""
+    if field not in SIMULATION_FIELDS:
+        raise ValueError(f"Cannot simulate '{field}'; choose from {list(SIMULATION_FIELDS)}")
+    if kind not in DISTRIBUTIONS:
+        raise ValueError(f"Unknown distribution '{kind}' for {field}; choose from {list(DISTRIBUTIONS)}")
+    if kind in ("normal", "lognormal") and (std is None or std < 0):
+        raise ValueError(f"{kind} distribution for {field} needs std >= 0")
+    if kind == "lognormal" and mean is not None and mean <= 0:
+        raise ValueError(f"lognormal distribution for {field} needs a positive mean (median)")
+    if kind in ("uniform", "triangular") and (low is None or high is None):
+        raise ValueError(f"{kind} distribution for {field} needs low and high")
+    if low is not None and high is not None and low > high:
+        raise ValueError(f"low > high in the distribution for {field}")
+    if kind == "triangular" and mean is not None and not low <= mean <= high:
+        raise ValueError(f"triangular mode for {field} must lie within [low, high]")
+
+
+def draw(rng, n, field, kind, base, mean=None, std=None, low=None, high=None) -> np.ndarray:
+    """``n`` samples of ``field``; ``mean`` (default: the base request value) centres the distribution.
+
+    normal: ``mean`` ± ``std``; lognormal: median ``mean``, ``std`` of the log;
+    uniform: [low, high]; triangular: low, mode ``mean``, high. Normal and
+    lognormal samples are clipped to ``low`` / ``high`` when given, and every
+    sample to the field's physical lower bound.
+    """
+    centre = base if mean is None else mean
+    if kind == "normal":
+        values = rng.normal(centre, std, n)
+    elif kind == "lognormal":
+        values = centre * np.exp(rng.normal(0.0, std, n))
+    elif kind == "uniform":
+        values = rng.uniform(low, high, n)
+    else:
+        mode = min(max(centre, low), high)
+        values = rng.triangular(low, mode, high, n) if low < high else np.full(n, float(low))
+    floor = SIMULATION_FIELDS[field]
+    lo = floor if low is None else (low if floor is None else max(low, floor))
+    if lo is not None or high is not None:
+        values = np.clip(values, lo, high)
+    return values
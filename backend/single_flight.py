@@ -0,0 +1,89 @@
+"""Single-flight: concurrent calls with the same key share one in-flight computation."""
+import asyncio
+import threading
+from concurrent.futures import Future
+
+
+class SingleFlight:
+    """Deduplicate identical concurrent calls, from threads or coroutines.
+
+    The first caller for a key (the leader) runs the computation; callers that
+    arrive while it is still running wait for and share its result or
+    exception. Nothing is kept once the leader finishes, so this only merges
+    overlapping calls (repeats over time are the prediction cache's job).
+    ``call`` serves sync code and ``run`` async code; both share one table, so
+    a coroutine can join a computation led by a thread and vice versa. In
+    ``run`` the computation is a task of its own, so cancelling any caller
+    (the leader included) neither stops it nor reaches the other callers.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._in_flight = {}
+        self._tasks = set()
+        self.calls = 0
+        self.deduplicated = 0
+
+    def _join(self, key):
+        """(future, is_leader) for ``key``."""
+        with self._lock:
+            self.calls += 1
+            future = self._in_flight.get(key)
+            if future is not None:
+                self.deduplicated += 1
+                return future, False
+            future = self._in_flight[key] = Future()
+            return future, True
+
+    def _finish(self, key, future, result=None, error=None):
+        with self._lock:
+            del self._in_flight[key]
+        if error is not None:
+            future.set_exception(error)
+        else:
+            future.set_result(result)
+
+    def call(self, key, fn):
+        """Return ``fn()``, or the result of an identical call already running."""
+        future, leader = self._join(key)
+        if not leader:
+            return future.result()
+        try:
+            result = fn()
+        except BaseException as e:
+            self._finish(key, future, error=e)
+            raise
+        self._finish(key, future, result)
+        return result
+
+    async def run(self, key, fn):
+        """Return ``await fn()``, or the result of an identical call already running."""
+        future, leader = self._join(key)
+        if leader:
+            try:
+                task = asyncio.ensure_future(fn())
+            except BaseException as e:
+                self._finish(key, future, error=e)
+                raise
+            self._tasks.add(task)
+            task.add_done_callback(lambda t: self._settle(key, future, t))
+        # shield: a cancelled caller must not cancel the shared future
+        return await asyncio.shield(asyncio.wrap_future(future))
+
+    def _settle(self, key, future, task):
+        self._tasks.discard(task)
+        if task.cancelled():
+            self._finish(key, future, error=asyncio.CancelledError())
+        elif task.exception() is not None:
+            self._finish(key, future, error=task.exception())
+        else:
+            self._finish(key, future, task.result())
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "calls": self.calls,
+                "executions": self.calls - self.deduplicated,
+                "deduplicated": self.deduplicated,
+                "in_flight": len(self._in_flight),
+            }
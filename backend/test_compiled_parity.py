@@ -0,0 +1,71 @@
+"""Bit-compatibility of the compiled tree library (compile_trees.py) with Booster.predict.
+
+The corpus is a recorded request log (JSON lines as written by the sampled
+request logger; ``prediction_request`` events) when one is given, else seeded
+requests over the form's input ranges (see parity_corpus.py). Feature rows are built by the serving
+feature plan, plus jittered default rows with NaN / zero cells to reach the
+missing-value branches. Both entry points must match exactly: float32 against
+Booster.predict on the same float32 rows, float64 against the float64 rows.
+Prediction cache keys built from float32-rounded rows must stay exact for the
+float32 entry point, including for values just below a split threshold.
+
+Run from backend/:  python test_compiled_parity.py [request log]   (or: python -m pytest test_compiled_parity.py)
+"""
+import os
+import sys
+import tempfile
+
+import numpy as np
+
+from compile_trees import CompiledEnsemble, compile_library
+from feature_plan import INPUT_FIELDS, request_columns
+from parity_corpus import CORPUS_PATH, booster_predict, corpus_requests, main
+from prediction_cache import ThresholdCache
+
+
+def corpus(path=CORPUS_PATH, seed=0) -> np.ndarray:
+    X = main.feature_plan.build(request_columns(corpus_requests(path, seed)))
+    rng = np.random.default_rng(seed)
+    jittered = main.feature_plan.base * rng.lognormal(0, 0.5, (500, main.feature_plan.n_features))
+    jittered[rng.random(jittered.shape) < 0.01] = np.nan
+    jittered[rng.random(jittered.shape) < 0.01] = 0.0
+    return np.vstack([X, jittered])
+
+
+def test_compiled_parity(path=CORPUS_PATH):
+    X = corpus(path)
+    with tempfile.TemporaryDirectory() as tmp:
+        lib_path = compile_library(main.models, os.path.join(tmp, "ensemble.so"))
+        for dtype in (np.float32, np.float64):
+            engine = CompiledEnsemble(lib_path, dtype)
+            rows = X.astype(dtype)
+            assert np.array_equal(engine.predict_log(rows), booster_predict(rows)), dtype.__name__
+    print(f"{len(X)} rows: float32 and float64 entry points bit-identical to Booster.predict "
+          f"({len(INPUT_FIELDS)} inputs, {X.shape[1]} features)")
+
+
+def test_float32_cache_keys():
+    """Rows with equal keys (from the float32-rounded row) get equal float32 predictions."""
+    cache = ThresholdCache(main.models, main.feature_plan.dynamic)
+    rows = []
+    for column, thresholds in zip(cache.columns, cache.thresholds):
+        # Just below each threshold (float32 may round it across) and mid-interval below it
+        lower = np.concatenate([[thresholds[0] - 1.0], thresholds[:-1]])
+        for value in np.concatenate([np.nextafter(thresholds, -np.inf), (lower + thresholds) / 2]):
+            row = main.feature_plan.base.copy()
+            row[column] = value
+            rows.append(row)
+    X = np.vstack(rows)
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = CompiledEnsemble(compile_library(main.models, os.path.join(tmp, "ensemble.so")), np.float32)
+        preds = engine.predict_log(X)
+    by_key = {}
+    for i, row in enumerate(X.astype(np.float32).astype(np.float64)):
+        first = by_key.setdefault(cache.key(row), i)
+        assert np.array_equal(preds[:, i], preds[:, first]), f"rows {first} and {i} share a key"
+    print(f"{len(X)} near-threshold rows: float32 cache keys exact ({len(by_key)} distinct keys)")
+
+
+if __name__ == "__main__":
+    test_compiled_parity(sys.argv[1] if len(sys.argv) > 1 else CORPUS_PATH)
+    test_float32_cache_keys()
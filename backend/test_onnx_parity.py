@@ -0,0 +1,51 @@
+"""Parity of the ONNX engine (onnx_export.py) against the current predict() outputs.
+
+Scores a corpus of sampled requests (parity_corpus.py) with the LightGBM
+boosters, then with the exported graph on onnxruntime, and compares assembled
+features, fold log predictions and the full predict() / score_requests()
+responses.
+
+Run from backend/:  python test_onnx_parity.py   (or: python -m pytest test_onnx_parity.py)
+"""
+import numpy as np
+
+from feature_plan import request_columns
+from onnx_export import OnnxEnsemble, export_onnx
+from parity_corpus import main, sampled_requests
+
+# Tree sums may be accumulated in a different order than LightGBM's
+MAX_LOG_DIFF = 1e-9
+
+
+def test_onnx_parity():
+    reqs = sampled_requests()
+    cols = request_columns(reqs)
+    engine = OnnxEnsemble(export_onnx(main.models, main.feature_plan))
+
+    # Feature assembly is bit-identical; fold sums agree to rounding
+    X = main.feature_plan.build(cols)
+    assert np.array_equal(engine.features(cols), X)
+    log_diff = np.abs(engine.predict_fold_logs(cols) - main.predict_fold_logs(X)).max()
+    assert log_diff <= MAX_LOG_DIFF, log_diff
+
+    reference = [main.predict(r) for r in reqs]
+    reference_batch = main.score_requests(reqs)
+    main.onnx_ensemble = engine
+    try:
+        onnx_single = [main.predict(r) for r in reqs]
+        onnx_batch = main.score_requests(reqs)
+    finally:
+        main.onnx_ensemble = None
+
+    # Incomes are truncated to whole rupees, so a 1e-9 log difference can flip the last one
+    mismatches = 0
+    for ref, got in zip(reference + reference_batch, onnx_single + onnx_batch):
+        assert abs(got["predicted_income"] - ref["predicted_income"]) <= 1
+        assert all(abs(a - b) <= 1 for a, b in zip(got["fold_predictions"], ref["fold_predictions"]))
+        mismatches += got != ref
+    print(f"{len(reqs)} requests: max |Δ fold log| {log_diff:.2e}, "
+          f"{mismatches}/{2 * len(reqs)} responses differ by a rupee")
+
+
+if __name__ == "__main__":
+    test_onnx_parity()
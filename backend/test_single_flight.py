@@ -0,0 +1,95 @@
+"""Single-flight (single_flight.py) under cancellation.
+
+A WebSocket session's scorer is cancelled when its client disconnects, while
+/api/predict calls with the same inputs may be waiting on the computation it
+leads. Cancelling the leader or a follower must leave the others with the
+result, and the computation must still run only once.
+
+Run from backend/:  python test_single_flight.py   (or: python -m pytest test_single_flight.py)
+"""
+import asyncio
+
+from single_flight import SingleFlight
+
+
+async def _leader_cancelled():
+    flight, started, release, runs = SingleFlight(), asyncio.Event(), asyncio.Event(), []
+
+    async def compute():
+        runs.append(1)
+        started.set()
+        await release.wait()
+        return 42
+
+    leader = asyncio.ensure_future(flight.run("k", compute))
+    await started.wait()
+    followers = [asyncio.ensure_future(flight.run("k", compute)) for _ in range(3)]
+    await asyncio.sleep(0)
+    leader.cancel()
+    await asyncio.sleep(0)
+    release.set()
+    results = await asyncio.gather(*followers)
+    assert leader.cancelled()
+    assert results == [42, 42, 42], results
+    assert len(runs) == 1
+    assert flight.stats()["in_flight"] == 0
+
+
+async def _follower_cancelled():
+    flight, started, release = SingleFlight(), asyncio.Event(), asyncio.Event()
+
+    async def compute():
+        started.set()
+        await release.wait()
+        return "done"
+
+    leader = asyncio.ensure_future(flight.run("k", compute))
+    await started.wait()
+    follower = asyncio.ensure_future(flight.run("k", compute))
+    await asyncio.sleep(0)
+    follower.cancel()
+    release.set()
+    assert await leader == "done"
+    assert follower.cancelled()
+
+
+async def _error_shared():
+    flight, started, release = SingleFlight(), asyncio.Event(), asyncio.Event()
+
+    async def compute():
+        started.set()
+        await release.wait()
+        raise ValueError("bad input")
+
+    leader = asyncio.ensure_future(flight.run("k", compute))
+    await started.wait()
+    follower = asyncio.ensure_future(flight.run("k", compute))
+    await asyncio.sleep(0)
+    release.set()
+    for call in (leader, follower):
+        try:
+            await call
+        except ValueError as e:
+            assert str(e) == "bad input"
+        else:
+            raise AssertionError("error was not shared")
+    assert flight.stats() == {"calls": 2, "executions": 1, "deduplicated": 1, "in_flight": 0}
+
+
+def test_leader_cancelled():
+    asyncio.run(_leader_cancelled())
+
+
+def test_follower_cancelled():
+    asyncio.run(_follower_cancelled())
+
+
+def test_error_shared():
+    asyncio.run(_error_shared())
+
+
+if __name__ == "__main__":
+    test_leader_cancelled()
+    test_follower_cancelled()
+    test_error_shared()
+    print("single-flight: cancelled leader / follower and shared errors OK")
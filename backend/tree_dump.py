@@ -0,0 +1,32 @@
+"""Constants and checks shared by the engines built from the fold models.
+
+The flat engine, the ONNX exporter, the C compiler and the prediction cache all
+walk ``Booster.dump_model()`` output themselves; they must agree with LightGBM
+on which objectives they can serve and on what counts as a zero for
+``missing_type == "Zero"`` splits. Artifacts saved to disk (merged model,
+compiled library) record ``models_fingerprint`` so a stale one is detected
+after retraining.
+Kept free of numba/onnx imports so every engine can share it.
+"""
+import hashlib
+
+# Objectives whose prediction is the raw tree sum
+IDENTITY_OBJECTIVES = ("regression", "regression_l1", "huber", "fair", "quantile", "mape")
+
+# |value| at or below this is treated as zero (LightGBM's kZeroThreshold)
+K_ZERO_THRESHOLD = 1e-35
+
+
+def check_identity_objective(dump: dict, engine: str):
+    """Raise NotImplementedError unless the dumped model predicts the raw tree sum."""
+    objective = dump.get("objective", "")
+    if objective.split(" ")[0] not in IDENTITY_OBJECTIVES or "sqrt" in objective:
+        raise NotImplementedError(f"Unsupported objective for {engine}: {objective}")
+
+
+def models_fingerprint(models) -> str:
+    """SHA-256 over the fold models' text (up to ``best_iteration``), in fold order."""
+    digest = hashlib.sha256()
+    for booster in models:
+        digest.update(booster.model_to_string(num_iteration=booster.best_iteration).encode())
+    return digest.hexdigest()
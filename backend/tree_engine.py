@@ -0,0 +1,208 @@
+"""Flattened-tree inference engine for the fold LightGBM ensemble.
+
+Every tree of every fold (up to its ``best_iteration``) is exported into flat
+NumPy node arrays and all folds are walked in one numba-compiled loop, which
+skips LightGBM's per-call validation and C-API overhead. Optional: requires
+``numba`` (see the root requirements.txt).
+"""
+import numpy as np
+from numba import njit, prange
+
+from tree_dump import K_ZERO_THRESHOLD, check_identity_objective
+
+# LightGBM missing_type codes, as encoded in decision_type
+MISSING_NONE, MISSING_ZERO, MISSING_NAN = 0, 1, 2
+_MISSING_CODES = {"None": MISSING_NONE, "Zero": MISSING_ZERO, "NaN": MISSING_NAN}
+
+# Rows scored together per pass over the trees (keeps the block's rows cache-resident)
+ROW_BLOCK = 256
+
+
+def _walk(X, nodes, vals, roots, tree_model, n_models):
+    n_rows = X.shape[0]
+    out = np.zeros((n_models, n_rows))
+    for b in prange((n_rows + ROW_BLOCK - 1) // ROW_BLOCK):
+        start = b * ROW_BLOCK
+        stop = min(start + ROW_BLOCK, n_rows)
+        for t in range(roots.shape[0]):
+            m = tree_model[t]
+            for i in range(start, stop):
+                node = roots[t]
+                while nodes[node, 0] >= 0:
+                    fval = X[i, nodes[node, 0]]
+                    flags = nodes[node, 2]
+                    mt = flags >> 1
+                    if np.isnan(fval) and mt != MISSING_NAN:
+                        fval = 0.0
+                    if (mt == MISSING_ZERO and abs(fval) <= K_ZERO_THRESHOLD) or (mt == MISSING_NAN and np.isnan(fval)):
+                        go_left = flags & 1
+                    else:
+                        go_left = fval <= vals[node]
+                    # Pre-order layout: the left child always follows its parent
+                    node = node + 1 if go_left else nodes[node, 1]
+                out[m, i] += vals[node]
+    return out
+
+
+_walk_serial = njit(cache=True)(_walk)
+_walk_parallel = njit(cache=True, parallel=True)(_walk)
+
+
+def _goes_left(fval, threshold, default_left, missing_type) -> bool:
+    """LightGBM's numerical split decision for one value (mirrors the kernel)."""
+    if np.isnan(fval) and missing_type != MISSING_NAN:
+        fval = 0.0
+    if (missing_type == MISSING_ZERO and abs(fval) <= K_ZERO_THRESHOLD) or \
+            (missing_type == MISSING_NAN and np.isnan(fval)):
+        return bool(default_left)
+    return fval <= threshold
+
+
+class _NodeBuilder:
+    """Accumulates nodes in pre-order, so a left child always follows its parent."""
+
+    def __init__(self):
+        self.cols = {k: [] for k in ("feature", "threshold", "left", "right",
+                                     "value", "default_left", "missing_type")}
+
+    def append(self, feature, threshold, value, default_left, missing_type) -> int:
+        k = len(self.cols["feature"])
+        row = (feature, threshold, -1, -1, value, default_left, missing_type)
+        for key, v in zip(self.cols, row):
+            self.cols[key].append(v)
+        return k
+
+    def link(self, k, left, right):
+        self.cols["left"][k] = left
+        self.cols["right"][k] = right
+
+
+class FlatEnsemble:
+    """All fold boosters as one set of flat node arrays.
+
+    Node ``k`` is a leaf when ``feature[k] == -1``; ``value[k]`` is then its output.
+    ``roots[t]`` is the first node of tree ``t`` and ``tree_model[t]`` its fold.
+    """
+
+    def __init__(self, builder: _NodeBuilder, roots, tree_model, n_models, n_features):
+        nodes = builder.cols
+        self.n_models = n_models
+        self.n_features = n_features
+        self.feature = np.array(nodes["feature"], dtype=np.int32)
+        self.threshold = np.array(nodes["threshold"], dtype=np.float64)
+        self.left = np.array(nodes["left"], dtype=np.int32)
+        self.right = np.array(nodes["right"], dtype=np.int32)
+        self.value = np.array(nodes["value"], dtype=np.float64)
+        self.default_left = np.array(nodes["default_left"], dtype=np.bool_)
+        self.missing_type = np.array(nodes["missing_type"], dtype=np.int8)
+        self.roots = np.array(roots, dtype=np.int32)
+        self.tree_model = np.array(tree_model, dtype=np.int32)
+
+        # Set by specialize(): rows whose fixed columns differ go to ``fallback``
+        self.fixed_idx = None
+        self.fixed_values = None
+        self.fallback = None
+
+        # Packed kernel layout: [feature, right, default_left | missing_type << 1], and
+        # the threshold (internal node) or output (leaf) in one float array
+        flags = self.default_left.astype(np.int32) | (self.missing_type.astype(np.int32) << 1)
+        self._nodes = np.ascontiguousarray(np.stack([self.feature, self.right, flags], axis=1))
+        self._vals = np.where(self.feature >= 0, self.threshold, self.value)
+
+    @classmethod
+    def from_boosters(cls, models) -> "FlatEnsemble":
+        """Export each booster's trees, up to its best_iteration."""
+        builder = _NodeBuilder()
+        roots, tree_model = [], []
+
+        def add(node) -> int:
+            if "split_feature" not in node:
+                if "leaf_coeff" in node:
+                    raise NotImplementedError("Linear trees are not supported by the flat engine")
+                return builder.append(-1, 0.0, node["leaf_value"], False, MISSING_NONE)
+            if node["decision_type"] != "<=":
+                raise NotImplementedError("Categorical splits are not supported by the flat engine")
+            k = builder.append(node["split_feature"], node["threshold"], 0.0,
+                               node["default_left"], _MISSING_CODES[node["missing_type"]])
+            builder.link(k, add(node["left_child"]), add(node["right_child"]))
+            return k
+
+        for m, booster in enumerate(models):
+            dump = booster.dump_model(num_iteration=booster.best_iteration)
+            check_identity_objective(dump, "flat engine")
+            if dump.get("average_output") or dump.get("num_tree_per_iteration", 1) != 1:
+                raise NotImplementedError("Flat engine supports single-output boosted ensembles only")
+
+            for tree in dump["tree_info"]:
+                roots.append(add(tree["tree_structure"]))
+                tree_model.append(m)
+
+        return cls(builder, roots, tree_model, len(models), models[0].num_feature())
+
+    def specialize(self, fixed_idx, fixed_values) -> "FlatEnsemble":
+        """Constant-fold every split on a fixed feature (partial evaluation).
+
+        The result only keeps splits on the remaining input-dependent features; trees
+        left without any split collapse to a single leaf, kept in place so the
+        per-fold summation order (and so the output) is unchanged. Rows whose
+        fixed columns do not match ``fixed_values`` are scored by this ensemble.
+        """
+        fixed_idx = np.asarray(fixed_idx, dtype=np.intp)
+        fixed_values = np.asarray(fixed_values, dtype=np.float64)
+        fixed = dict(zip(fixed_idx.tolist(), fixed_values.tolist()))
+        builder = _NodeBuilder()
+
+        def copy(k) -> int:
+            # Resolve chains of fixed splits down to the first dynamic node or leaf
+            while self.feature[k] >= 0 and int(self.feature[k]) in fixed:
+                go_left = _goes_left(fixed[int(self.feature[k])], self.threshold[k],
+                                     self.default_left[k], self.missing_type[k])
+                k = self.left[k] if go_left else self.right[k]
+            new = builder.append(int(self.feature[k]), float(self.threshold[k]), float(self.value[k]),
+                                 bool(self.default_left[k]), int(self.missing_type[k]))
+            if self.feature[k] >= 0:
+                builder.link(new, copy(self.left[k]), copy(self.right[k]))
+            return new
+
+        roots = [copy(r) for r in self.roots]
+        spec = FlatEnsemble(builder, roots, self.tree_model, self.n_models, self.n_features)
+        spec.fixed_idx = fixed_idx
+        spec.fixed_values = fixed_values
+        spec.fallback = self
+        return spec
+
+    def compile(self):
+        """JIT-compile the serial and parallel kernels ahead of the first request."""
+        X = np.zeros((ROW_BLOCK + 1, self.n_features))
+        _walk_serial(X[:1], self._nodes, self._vals, self.roots, self.tree_model, self.n_models)
+        _walk_parallel(X, self._nodes, self._vals, self.roots, self.tree_model, self.n_models)
+
+    @property
+    def n_trees(self):
+        return len(self.roots)
+
+    @property
+    def n_nodes(self):
+        return len(self.feature)
+
+    @property
+    def n_constant_trees(self):
+        """Trees that are a single leaf, i.e. contain no split at all."""
+        return int((self.feature[self.roots] < 0).sum())
+
+    def predict_log(self, X: np.ndarray) -> np.ndarray:
+        """(N, n_features) → (n_models, N) raw predictions, one row per fold."""
+        X = np.ascontiguousarray(X, dtype=np.float64)
+        if self.fallback is not None:
+            matches = (X[:, self.fixed_idx] == self.fixed_values).all(axis=1)
+            if not matches.all():
+                out = np.empty((self.n_models, X.shape[0]))
+                out[:, ~matches] = self.fallback.predict_log(X[~matches])
+                if matches.any():
+                    out[:, matches] = self._walk(X[matches])
+                return out
+        return self._walk(X)
+
+    def _walk(self, X):
+        walk = _walk_parallel if X.shape[0] > ROW_BLOCK else _walk_serial
+        return walk(X, self._nodes, self._vals, self.roots, self.tree_model, self.n_models)
@@ -0,0 +1,68 @@
+"""Startup warm-up: run synthetic requests through the serving path before taking traffic.
+
+The first predictions after a deploy pay for lazy LightGBM predictor setup,
+numba compilation, first-touch of the model pages and empty caches. ``Warmup``
+runs a list of async steps once at startup and keeps their latencies, which the
+readiness endpoint reports.
+"""
+import time
+
+import numpy as np
+
+
+def synthetic_requests(base: dict, fields, n, seed=0) -> list:
+    """``n`` request dicts: ``base`` with every numeric ``fields`` value scaled by U(0.5, 1.5)."""
+    rng = np.random.default_rng(seed)
+    return [{**base, **{f: float(base[f]) * rng.uniform(0.5, 1.5) for f in fields}} for _ in range(n)]
+
+
+class Warmup:
+    """Run ``(kind, async callable)`` steps in order and record per-kind latencies.
+
+    ``ready`` turns True once every step has run. A failing step stops the
+    warm-up and leaves it ``failed`` (never ready), with the error kept for
+    the readiness endpoint.
+    """
+
+    def __init__(self):
+        self.state = "pending"
+        self.error = None
+        self.duration = None
+        self._latencies = {}
+
+    @property
+    def ready(self) -> bool:
+        return self.state == "ready"
+
+    async def run(self, steps):
+        self.state = "running"
+        start = time.perf_counter()
+        try:
+            for kind, step in steps:
+                t0 = time.perf_counter()
+                await step()
+                self._latencies.setdefault(kind, []).append(time.perf_counter() - t0)
+        except Exception as e:
+            self.state = "failed"
+            self.error = f"{type(e).__name__}: {e}"
+        else:
+            self.state = "ready"
+        finally:
+            self.duration = time.perf_counter() - start
+
+    def stats(self) -> dict:
+        steps = {}
+        for kind, latencies in self._latencies.items():
+            ms = np.array(latencies) * 1000.0
+            steps[kind] = {
+                "count": len(ms),
+                "first_ms": float(ms[0]),
+                "median_ms": float(np.median(ms)),
+                "max_ms": float(ms.max()),
+            }
+        return {
+            "state": self.state,
+            "error": self.error,
+            "duration_ms": self.duration * 1000.0 if self.duration is not None else None,
+            "steps": steps,
+        }
@@ -147,3 +147,9 @@ EARLY_STOPPING_ROUNDS = 100
 
 # Target encoding smoothing factor
 TE_SMOOTHING = 20
+
+# Standard-error tolerances (log scale) compared by the adaptive fold report
+# (python src/predict.py --adaptive-report); 0 = all folds
+ADAPTIVE_FOLD_TOLERANCES = [0.0, 0.002, 0.005, 0.01, 0.02, 0.05]
+# Rows timed one at a time (serving-style single predictions) per tolerance
+ADAPTIVE_LATENCY_ROWS = 500
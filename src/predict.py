@@ -4,6 +4,7 @@ Prediction module: load fold models, ensemble predictions, save results.
 
 import os
 import sys
+import time
 import numpy as np
 import pandas as pd
 import joblib
@@ -68,9 +69,101 @@ def predict(X_test, farmer_ids, model_dir=None):
     return submission
 
 
+def early_exit_predict(models, X, tol, min_folds=2):
+    """
+    Adaptive fold ensemble: evaluate folds in order, per row, until the standard
+    error of the running mean log prediction drops below ``tol``.
+
+    Same rule as the backend's ADAPTIVE_FOLD_TOLERANCE mode.
+
+    Args:
+        models: fold boosters, in evaluation order
+        X: (N, features) float array
+        tol: standard-error tolerance in log space (0 = always all folds)
+        min_folds: folds evaluated before early exit is considered
+
+    Returns:
+        (mean log prediction per row, number of folds used per row)
+    """
+    preds = np.full((len(models), len(X)), np.nan)
+    active = np.arange(len(X))
+    for k, model in enumerate(models, 1):
+        preds[k - 1, active] = model.predict(X[active], num_iteration=model.best_iteration)
+        if k >= min_folds:
+            seen = preds[:k, active]
+            se = seen.std(axis=0, ddof=1) / np.sqrt(k)
+            active = active[se >= tol]
+        if len(active) == 0:
+            break
+    return np.nanmean(preds, axis=0), (~np.isnan(preds)).sum(axis=0)
+
+
+def adaptive_fold_report(X_test, tolerances=None, model_dir=None):
+    """
+    Accuracy-versus-latency trade-off of the adaptive fold ensemble on the test set.
+
+    The test set is unlabelled, so accuracy is measured against the full
+    5-fold ensemble. Latency is measured both for the whole test set in one
+    call and for ``cfg.ADAPTIVE_LATENCY_ROWS`` single-row predictions, as served.
+
+    Returns:
+        report DataFrame, one row per tolerance (also saved to reports/)
+    """
+    if tolerances is None:
+        tolerances = cfg.ADAPTIVE_FOLD_TOLERANCES
+    if model_dir is None:
+        model_dir = cfg.MODEL_DIR
+
+    model_files = sorted([f for f in os.listdir(model_dir) if f.startswith("lgb_fold")])
+    if not model_files:
+        raise FileNotFoundError(f"No fold models found in {model_dir}")
+    models = [joblib.load(os.path.join(model_dir, f)) for f in model_files]
+
+    X = np.ascontiguousarray(X_test.to_numpy(dtype=np.float64))
+    full_log, _ = early_exit_predict(models, X, 0.0)
+    full_income = np.expm1(full_log)
+    single_rows = X[:cfg.ADAPTIVE_LATENCY_ROWS]
+
+    rows = []
+    for tol in tolerances:
+        start = time.perf_counter()
+        mean_log, used = early_exit_predict(models, X, tol)
+        batch_s = time.perf_counter() - start
+
+        start = time.perf_counter()
+        for i in range(len(single_rows)):
+            early_exit_predict(models, single_rows[i:i + 1], tol)
+        single_s = (time.perf_counter() - start) / len(single_rows)
+
+        rel_err = np.abs(np.expm1(mean_log) - full_income) / np.maximum(full_income, 1.0)
+        rows.append({
+            "tolerance": tol,
+            "mean_folds": used.mean(),
+            "pct_rows_early_exit": (used < len(models)).mean() * 100,
+            "mean_abs_pct_vs_full": rel_err.mean() * 100,
+            "p99_abs_pct_vs_full": np.percentile(rel_err, 99) * 100,
+            "max_abs_pct_vs_full": rel_err.max() * 100,
+            "batch_ms_per_1k_rows": batch_s / len(X) * 1e6,
+            "single_row_ms": single_s * 1e3,
+        })
+
+    report = pd.DataFrame(rows)
+    os.makedirs(cfg.REPORT_DIR, exist_ok=True)
+    output_path = os.path.join(cfg.REPORT_DIR, "adaptive_folds.csv")
+    report.to_csv(output_path, index=False)
+
+    print("\nAdaptive fold ensemble: accuracy vs latency (test set, vs full ensemble)")
+    print(report.to_string(index=False, float_format=lambda v: f"{v:.4f}"))
+    print(f"\nReport saved to {output_path}")
+    return report
+
+
 if __name__ == "__main__":
     sys.path.insert(0, os.path.dirname(__file__))
     from data_prep import prepare_datasets
 
     X_train, y_train, X_test, farmer_ids = prepare_datasets()
-    submission = predict(X_test, farmer_ids)
+    if "--adaptive-report" in sys.argv[1:]:
+        adaptive_fold_report(X_test)
+    else:
+        submission = predict(X_test, farmer_ids)